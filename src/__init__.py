@@ -1,19 +1,22 @@
 """FM Station Inspection Planner Package"""
 
-from .core import FMStationPlanner, InteractivePlanner, MultiDayPlanner
-from .database import StationDatabase
-from .services import OpenRouterClient, PlanEvaluationAgent
-from .config import Config
+from .utils.lazy import lazy_exports
+
+# Public name -> defining submodule. Names are imported on first access, so importing
+# one submodule does not pull in the LangGraph, LLM and database stack behind the others
+_EXPORTS = {
+    'FMStationPlanner': '.core',
+    'InteractivePlanner': '.core',
+    'MultiDayPlanner': '.core',
+    'StationDatabase': '.database',
+    'OpenRouterClient': '.services',
+    'PlanEvaluationAgent': '.services',
+    'Config': '.config'
+}
 
 __version__ = "1.0.0"
 __author__ = "FM Station Inspection Team"
 
-__all__ = [
-    'FMStationPlanner',
-    'InteractivePlanner',
-    'MultiDayPlanner',
-    'StationDatabase',
-    'OpenRouterClient',
-    'PlanEvaluationAgent',
-    'Config'
-]
\ No newline at end of file
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -76,6 +76,9 @@ class Config:
     # Geospatial Settings
     DEFAULT_SPEED_KMH = 40  # Average driving speed in urban areas
 
+    # Routing Settings
+    PARALLEL_ROUTING = os.getenv("PARALLEL_ROUTING", "true").lower() != "false"  # Concurrent per-leg routing requests
+
     @classmethod
     def get_model(cls, task_type: str) -> ModelConfig:
         """Get appropriate model configuration for task type"""
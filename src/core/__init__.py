@@ -1,12 +1,15 @@
 """Core FM Station Inspection Planning modules"""
 
-from .planner import FMStationPlanner, InteractivePlanner
-from .agents import FMStationState
-from .multi_day_planner import MultiDayPlanner
-
-__all__ = [
-    'FMStationPlanner',
-    'InteractivePlanner',
-    'FMStationState',
-    'MultiDayPlanner'
-]
\ No newline at end of file
+from ..utils.lazy import lazy_exports
+
+# Public name -> defining submodule, imported on first access (as in src/__init__.py)
+_EXPORTS = {
+    'FMStationPlanner': '.planner',
+    'InteractivePlanner': '.planner',
+    'FMStationState': '.agents',
+    'MultiDayPlanner': '.multi_day_planner'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
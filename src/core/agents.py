@@ -8,19 +8,27 @@ from geopy.geocoders import Nominatim
 from ..services.openrouter_client import OpenRouterClient
 from ..database.database import StationDatabase
 from ..utils.location_tool import LocationTool
+from ..utils.geo_kernels import haversine_matrix_km
 from ..config.config import Config
 import logging
 import operator
+import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class FMStationState(TypedDict):
-    """State for the FM Station Planning workflow"""
+class FMStationState(TypedDict, total=False):
+    """
+    State for the FM Station Planning workflow
+
+    Only the request fields are set up front; every other field is absent until a
+    node returns it, so nodes read them with state.get(key, default).
+    """
     user_input: str  # Original user input
     requirements: Dict[str, Any]  # Extracted requirements
     location_coords: Dict[str, Any]  # Location coordinates
+    location_fallback: bool  # location_coords is the Bangkok default for a province that failed to geocode
     start_location: Dict[str, Any]  # Starting point for route
     stations: List[Dict[str, Any]]  # Found stations
     route_info: Dict[str, Any]  # Route optimization results
@@ -141,10 +149,11 @@ def location_processing_node(state: FMStationState) -> Dict[str, Any]:
             except Exception as e:
                 logger.error(f"Geocoding failed: {e}")
 
-        # Fallback to Bangkok if geocoding fails
+        # Fallback to Bangkok if geocoding fails (flagged so the node cache doesn't keep it)
         if not coordinates:
             coordinates = {"lat": 13.7563, "lon": 100.5018, "name": "Bangkok"}
             logger.warning(f"Could not geocode {province}, using Bangkok as default")
+            return {"location_coords": coordinates, "location_fallback": True}
 
         logger.info(f"Location coordinates: {coordinates}")
 
@@ -254,50 +263,60 @@ def _group_stations_by_district(stations: List[Dict]) -> Dict[str, List[int]]:
 
     return sorted_districts
 
+def _route_distance_rows(stations: List[Dict], start_location: Dict) -> Tuple[List[List[float]], List[bool]]:
+    """
+    Pairwise great-circle distances for routing, plus which stations have GPS
+
+    Row/column 0 is the start location and station i is row/column i + 1. The matrix
+    comes from one broadcast haversine, so each nearest-neighbor step below is a scan
+    of one row instead of a haversine call per candidate.
+    """
+    located = [bool(s.get("latitude") and s.get("longitude")) for s in stations]
+    points = [(start_location.get("lat", 13.7563), start_location.get("lon", 100.5018))]
+    points.extend((float(s["latitude"]), float(s["longitude"])) if ok else (0.0, 0.0)
+                  for s, ok in zip(stations, located))
+    points = np.radians(np.asarray(points, dtype=np.float64))
+    return haversine_matrix_km(points[:, 0], points[:, 1]).tolist(), located
+
+def _greedy_nearest_order(candidates: List[int], distance_rows: List[List[float]], located: List[bool],
+                          row: int) -> Tuple[List[int], int]:
+    """
+    Visit candidate stations nearest-first from a matrix row (0 = start location)
+
+    Returns the visiting order, with stations lacking GPS appended in their original
+    order, and the matrix row of the last station visited.
+    """
+    # Candidates as matrix rows; min() keeps the first of equally near stations
+    remaining = [idx + 1 for idx in candidates if located[idx]]
+    order = []
+
+    while remaining:
+        row = min(remaining, key=distance_rows[row].__getitem__)
+        remaining.remove(row)
+        order.append(row - 1)
+
+    order.extend(idx for idx in candidates if not located[idx])
+    return order, row
+
 def _district_based_route(stations: List[Dict], start_location: Dict) -> List[int]:
     """District-based routing: prioritize districts with most stations"""
     if not stations:
         return []
 
-    from haversine import haversine
-
     # Group stations by district
     district_groups = _group_stations_by_district(stations)
 
     route = []
-    current_pos = (start_location.get("lat", 13.7563),
-                  start_location.get("lon", 100.5018))
+    distance_rows, located = _route_distance_rows(stations, start_location)
+    current_row = 0
 
     # Process each district in order of station count (highest first)
     for district, station_indices in district_groups.items():
         logger.info(f"Processing district '{district}' with {len(station_indices)} stations")
 
         # Within each district, use nearest neighbor
-        unvisited_in_district = station_indices.copy()
-
-        while unvisited_in_district:
-            nearest_idx = None
-            min_distance = float('inf')
-
-            for idx in unvisited_in_district:
-                station = stations[idx]
-                if station.get("latitude") and station.get("longitude"):
-                    station_pos = (station["latitude"], station["longitude"])
-                    distance = haversine(current_pos, station_pos)
-
-                    if distance < min_distance:
-                        min_distance = distance
-                        nearest_idx = idx
-
-            if nearest_idx is not None:
-                route.append(nearest_idx)
-                unvisited_in_district.remove(nearest_idx)
-                station = stations[nearest_idx]
-                current_pos = (station["latitude"], station["longitude"])
-            else:
-                # Add remaining stations in district
-                route.extend(unvisited_in_district)
-                break
+        district_route, current_row = _greedy_nearest_order(station_indices, distance_rows, located, current_row)
+        route.extend(district_route)
 
     return route
 
@@ -306,38 +325,8 @@ def _nearest_neighbor_route(stations: List[Dict], start_location: Dict) -> List[
     if not stations:
         return []
 
-    from haversine import haversine
-
-    unvisited = list(range(len(stations)))
-    route = []
-    current_pos = (start_location.get("lat", 13.7563),
-                  start_location.get("lon", 100.5018))
-
-    while unvisited:
-        # Find nearest unvisited station
-        nearest_idx = None
-        min_distance = float('inf')
-
-        for idx in unvisited:
-            station = stations[idx]
-            if station.get("latitude") and station.get("longitude"):
-                station_pos = (station["latitude"], station["longitude"])
-                distance = haversine(current_pos, station_pos)
-
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_idx = idx
-
-        if nearest_idx is not None:
-            route.append(nearest_idx)
-            unvisited.remove(nearest_idx)
-            station = stations[nearest_idx]
-            current_pos = (station["latitude"], station["longitude"])
-        else:
-            # Add remaining stations
-            route.extend(unvisited)
-            break
-
+    distance_rows, located = _route_distance_rows(stations, start_location)
+    route, _ = _greedy_nearest_order(range(len(stations)), distance_rows, located, 0)
     return route
 
 
@@ -574,7 +563,7 @@ def step_by_step_planning_node(state: FMStationState) -> Dict[str, Any]:
         current_location = state.get("current_location")
         requirements = state.get("requirements", {})
         station_count = requirements.get("station_count", 5)
-        visited_station_ids = state.get("visited_station_ids", [])
+        visited_station_ids = list(state.get("visited_station_ids", []))  # Extended below; keep the state's list intact
 
         if not current_location:
             return {"errors": ["Current location is required for step-by-step planning"]}
@@ -1,21 +1,252 @@
 """Multi-Day FM Station Inspection Planner"""
 
+import math
 import re
-from typing import List, Dict, Tuple, Optional, Any
+import threading
+import time
+from collections import defaultdict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from typing import List, Dict, Tuple, Optional, Any, Iterable, Iterator
 from datetime import datetime, timedelta
-from haversine import haversine, Unit
-from ..database.database import StationDatabase
-from ..services.openrouter_client import OpenRouterClient
-from ..services.travel_time_service import TravelTimeService
-from ..services.district_worth_agent import DistrictWorthAgent
-from ..services.plan_monitor_agent import PlanMonitorAgent
-from ..services.auto_fix_agent import AutoFixAgent
+import numpy as np
+from ..utils.geo_kernels import (
+    NearestStationIndex, group_means, haversine_km_rad, optimize_tour, sweep_partition, tour_length,
+    within_bounding_box
+)
 from ..config.config import Config
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Response templates (one format call per station / per day instead of one append per line)
+STATION_TEMPLATE = (
+    "{i}. **Station Name**: {name}\n"
+    "   - **Frequency**: {freq} MHz\n"
+    "   - **Province**: {province}\n"
+    "   - **District**: {district}\n"
+    "   - **Distance**: {distance_km} km from previous location\n"
+    "   - **Travel Time**: {travel_minutes} minutes\n"
+)
+
+# District-optimized response: day header and one station line (plus the hop to the next)
+DISTRICT_DAY_HEADER_TEMPLATE = (
+    "## 📅 Day {day} - {station_count} stations\n"
+    "**Districts**: {districts}\n"
+    "**Travel**: {total_distance:.1f}km, {total_time:.1f} hours\n"
+)
+DISTRICT_STATION_TEMPLATE = "{i}. **{name}** ({district}){transition}"
+SAME_DISTRICT_TRANSITION = "\n   ↳ Same district (minimal travel)"
+
+DAY_SUMMARY_TEMPLATE = (
+    "**Day {day} Summary:**\n"
+    "- **Start Time**: {start_time}\n"
+    "- **Lunch Break**: {lunch_start} - {lunch_end} (1 hour)\n"
+    "- **Total Distance**: {total_distance_km} km\n"
+    "- **Travel Time**: {total_time_minutes} minutes\n"
+    "- **Inspection Time**: {inspection_minutes} minutes\n"
+    "- **Return Home Time**: {return_time} (estimated arrival time)\n"
+    "- **Estimated Return**: Will arrive home at {return_time}\n"
+    "{status_line}\n"
+)
+
+# Province mapping - Thai names, English names, and abbreviations
+PROVINCE_MAPPINGS = {
+    # Thai names
+    "ชัยภูมิ": "ชัยภูมิ",
+    "นครราชสีมา": "นครราชสีมา",
+    "บุรีรัมย์": "บุรีรัมย์",
+    # English names
+    "chaiyaphum": "ชัยภูมิ",
+    "nakhon ratchasima": "นครราชสีมา",
+    "nakorn ratchasima": "นครราชสีมา",
+    "nakhonratchasima": "นครราชสีมา",
+    "nakornratchasima": "นครราชสีมา",
+    "buriram": "บุรีรัมย์",
+    "buri ram": "บุรีรัมย์",
+    # Abbreviations
+    "cyp": "ชัยภูมิ",
+    "nkr": "นครราชสีมา",
+    "brr": "บุรีรัมย์"
+}
+
+# Travel info sources backed by a routing API; estimates (fallback/default) are not kept
+ROUTED_TRAVEL_SOURCES = frozenset({'openrouteservice', 'openrouteservice_matrix', 'osrm'})
+
+# Station count / day count numbers in the request
+DIGITS_PATTERN = re.compile(r'\d+')
+
+# All province keys as one alternation (longest first), compiled once at import
+PROVINCE_PATTERN = re.compile(
+    "|".join(re.escape(key) for key in sorted(PROVINCE_MAPPINGS, key=len, reverse=True))
+)
+PARSE_CACHE_SIZE = 512  # Distinct multi-day requests kept parsed (retries re-send the same text)
+
+# Intervention reply phrases per action, in priority order (first matching action wins)
+INTERVENTION_PHRASES = (
+    ("auto_fix", ('fix it', 'auto fix', 'fix automatically', 'implement fix')),
+    ("show_options", ('show options', 'see options', 'alternatives')),
+    ("ignore_warnings", ('ignore', 'proceed anyway', 'keep plan', 'ignore warnings')),
+    ("optimize", ('optimize', 'improve', 'make better')),
+)
+INTERVENTION_PHRASE_ACTIONS = {
+    phrase: action for action, phrases in INTERVENTION_PHRASES for phrase in phrases
+}
+# One anchored alternative per action, tried in priority order: each looks ahead for
+# any of its phrases and sets an empty named group, so match().lastgroup is the action
+INTERVENTION_PATTERN = re.compile(
+    "(?s)^(?:" + "|".join(
+        f"(?=.*?(?:{'|'.join(re.escape(phrase) for phrase in phrases)}))(?P<{action}>)"
+        for action, phrases in INTERVENTION_PHRASES
+    ) + ")"
+)
+
+
+def classify_intervention(text: str) -> Optional[str]:
+    """
+    Map a reply to an intervention message to its action
+
+    Returns "auto_fix", "show_options", "ignore_warnings" or "optimize", or None if
+    the reply names none of them.
+    """
+    text = text.lower().strip()
+
+    # Exact replies ("fix it") hit the phrase table directly; otherwise the combined
+    # pattern names the highest-priority action with a phrase anywhere in the reply
+    action = INTERVENTION_PHRASE_ACTIONS.get(text)
+    if action is None:
+        match = INTERVENTION_PATTERN.match(text)
+        action = match.lastgroup if match else None
+    return action
+
+
+# Static intervention replies (built once at import instead of on every call)
+AUTO_FIX_APPLIED_TEMPLATE = (
+    "🔧 **AUTO-FIX APPLIED!**\n"
+    "\n"
+    "{user_message}\n"
+    "\n"
+    "**🎯 Executing new request**: {new_request}\n"
+    "\n"
+    "Processing your optimized plan..."
+)
+FIX_ALTERNATIVES_HEADER = "🔧 **ALTERNATIVE FIX OPTIONS**\n\nChoose the best solution for your needs:\n\n"
+FIX_ALTERNATIVE_TEMPLATE = (
+    "**{i}. {title}**\n"
+    "   {description}\n"
+    "   ✅ Benefits: {benefits}\n"
+    "   ⚠️ Trade-offs: {trade_offs}\n"
+    "\n"
+)
+FIX_ALTERNATIVES_FOOTER = (
+    "**Quick responses:**\n"
+    "- Type '1' for the first option\n"
+    "- Type '2' for the second option\n"
+    "- Type '3' for the third option (if available)\n"
+    "- Type 'back' to return to auto-fix"
+)
+AUTO_FIX_COMPLETED_MESSAGE = "✅ Auto-fix completed! Generating your improved plan..."
+AUTO_FIX_FAILED_MESSAGE = "❌ Auto-fix failed. Please try manual adjustments."
+
+IGNORE_WARNINGS_MESSAGE = """⚠️ **PROCEEDING WITH RISKY PLAN**
+
+You've chosen to proceed despite safety warnings. Please note:
+
+🚨 **Risks acknowledged:**
+- Potential inspector fatigue
+- Safety concerns with long driving days
+- Possible quality reduction due to time pressure
+
+✅ **Your original plan will be used as-is**
+
+**Safety reminders:**
+- Take regular breaks during long drives
+- Don't hesitate to stop if feeling tired
+- Consider splitting difficult days if needed
+
+Proceeding with your original request..."""
+
+OPTIMIZATION_STARTED_MESSAGE = """💡 **PLAN OPTIMIZATION STARTED**
+
+🔄 Analyzing your plan for efficiency improvements...
+
+**Optimization targets:**
+- Route sequence efficiency
+- Travel time reduction
+- Workload balancing
+- Fatigue minimization
+
+Generating your optimized plan..."""
+
+INTERVENTION_HELP_MESSAGE = """💭 **INTERVENTION OPTIONS**
+
+I didn't understand your response. Here are your options:
+
+**🔧 For automatic fixes:**
+- Type **'fix it'** - Apply best automatic solution
+- Type **'show options'** - See all available fixes
+
+**⚡ For optimization:**
+- Type **'optimize'** - Improve plan efficiency
+
+**⚠️ To proceed anyway:**
+- Type **'ignore warnings'** - Keep risky plan
+
+**❓ Need help:**
+- Type **'explain'** - Get detailed explanation
+
+What would you like to do?"""
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_multi_day_fields(user_input: str) -> Optional[Tuple[Any, int, int, Tuple[str, ...]]]:
+    """
+    Parse a multi-day request into (province, station count, days, matched provinces)
+
+    Pure and cached on the input text; multi-province requests give the province as a
+    tuple. Returns None when no province is found.
+    """
+    # Convert to lowercase for easier matching
+    input_lower = user_input.lower()
+
+    # Extract numbers (only station count and days are used)
+    numbers = [match.group() for match in islice(DIGITS_PATTERN.finditer(user_input), 2)]
+
+    # Find matching provinces in one regex pass, reported in mapping order
+    found_keys = set(PROVINCE_PATTERN.findall(input_lower))
+    matched_provinces = tuple(dict.fromkeys(
+        thai_name for key, thai_name in PROVINCE_MAPPINGS.items() if key in found_keys
+    ))
+
+    # Handle multi-province requests
+    if len(matched_provinces) > 1:
+        logger.info(f"Multi-province request detected: {matched_provinces}")
+        # Use all matched provinces for multi-province planning
+        province = matched_provinces  # Pass all provinces
+        logger.info(f"Planning for multiple provinces: {province}")
+    elif len(matched_provinces) == 1:
+        province = matched_provinces[0]
+    else:
+        logger.warning(f"No valid province found in: {user_input}")
+        return None
+
+    # Determine station count and days
+    station_count = 10  # default
+    days = 1  # default
+
+    if len(numbers) >= 1:
+        station_count = int(numbers[0])
+    if len(numbers) >= 2:
+        days = int(numbers[1])
+    elif "2 day" in input_lower or "two day" in input_lower or "2day" in input_lower:
+        days = 2
+
+    logger.info(f"Parsed request: {station_count} stations in {province} for {days} days")
+
+    return province, station_count, days, matched_provinces
+
+
 class MultiDayPlanner:
     """Multi-day FM station inspection planner with home return requirements"""
 
@@ -27,18 +258,191 @@ class MultiDayPlanner:
     DAILY_END_TIME = "17:00"    # 5:00 PM (must be home by this time)
     LUNCH_START_TIME = "12:00"  # 12:00 PM lunch break start
     LUNCH_END_TIME = "13:00"    # 1:00 PM lunch break end
+    # The same times as minutes since midnight, for the planning arithmetic
+    DAILY_START_MINUTES = 9 * 60
+    DAILY_END_MINUTES = 17 * 60
+    LUNCH_START_MINUTES = 12 * 60
+    DISTRICT_LAST_START_MINUTES = 16 * 60  # By-district days start no station at/after 4 PM
     LUNCH_DURATION_MINUTES = 60  # 1 hour lunch break
     INSPECTION_TIME_MINUTES = 10  # Minutes per station
     AVERAGE_SPEED_KMH = 100      # Average travel speed with car using Google Maps
     SAFETY_BUFFER_MINUTES = 30   # Safety buffer for return journey
+    # Farthest a there-and-back day trip can go: half the working day (minus lunch and
+    # the return buffer) at average speed
+    DAY_TRIP_REACH_KM = AVERAGE_SPEED_KMH * (
+        DAILY_END_MINUTES - DAILY_START_MINUTES - LUNCH_DURATION_MINUTES - SAFETY_BUFFER_MINUTES
+    ) / 60 / 2
+    PROVINCE_CACHE_TTL_SECONDS = 600  # Reuse province station lists for 10 minutes
+    RETURN_LEG_REUSE_KM = 1.0         # A day ending this close to its district entry reuses the leg out
+    TRAVEL_PREFETCH_WORKERS = 10      # Concurrent routing requests per day route
+    MAX_PARALLEL_DAYS = 4             # Days planned at once (each prefetches with its own workers)
+    TRAVEL_CACHE_SIZE = 4096          # Routed legs kept per planner, oldest evicted first
+
+    # (province, limit) -> (fetched_at, stations). Shared by all planners: the graph
+    # builds a new planner for every request
+    _province_cache: Dict[Tuple[str, int], Tuple[float, List[Dict]]] = {}
+    _province_cache_lock = threading.Lock()
 
     def __init__(self):
-        self.db = StationDatabase()
-        self.llm_client = OpenRouterClient()
-        self.travel_service = TravelTimeService()
-        self.district_worth_agent = DistrictWorthAgent()
-        self.monitor_agent = PlanMonitorAgent()
-        self.auto_fix_agent = AutoFixAgent()
+        # Services are created on first use (see the cached properties below), so
+        # callers that only parse requests never open DB or API clients
+
+        # (origin lat, lon, destination lat, lon) rounded to ~1 m -> travel info
+        # Only routed results are kept; day threads write it concurrently
+        self._tt_cache: Dict[Tuple[float, float, float, float], Dict] = {}
+        self._tt_cache_lock = threading.Lock()
+        # (origin district or "HOME", destination district, rounded endpoints) -> travel
+        # info; reset for every by-district plan (see plan_with_district_optimization)
+        self._district_travel_cache: Dict[Tuple, Dict] = {}
+        # district -> (entry station coordinates, travel info of the leg out of home)
+        self._district_return_seeds: Dict[str, Tuple[Tuple[float, float], Dict]] = {}
+
+    @cached_property
+    def db(self):
+        from ..database.database import StationDatabase
+        return StationDatabase()
+
+    @cached_property
+    def llm_client(self):
+        from ..services.openrouter_client import OpenRouterClient
+        return OpenRouterClient()
+
+    @cached_property
+    def travel_service(self):
+        from ..services.travel_time_service import TravelTimeService
+        return TravelTimeService()
+
+    @cached_property
+    def district_worth_agent(self):
+        from ..services.district_worth_agent import DistrictWorthAgent
+        return DistrictWorthAgent()
+
+    @cached_property
+    def monitor_agent(self):
+        from ..services.plan_monitor_agent import PlanMonitorAgent
+        return PlanMonitorAgent()
+
+    @cached_property
+    def auto_fix_agent(self):
+        from ..services.auto_fix_agent import AutoFixAgent
+        return AutoFixAgent()
+
+    @cached_property
+    def evaluator(self):
+        from ..services.plan_evaluator import PlanEvaluationAgent
+        return PlanEvaluationAgent()
+
+    def _get_province_stations(self, province: str, limit: int = 1000) -> List[Dict]:
+        """
+        Get available stations in a province, cached for PROVINCE_CACHE_TTL_SECONDS
+
+        The returned dicts are shared with the cache and other requests - select and
+        copy before mutating.
+        """
+        key = (province, limit)
+        now = time.monotonic()
+
+        with self._province_cache_lock:
+            cached = self._province_cache.get(key)
+        if cached and now - cached[0] < self.PROVINCE_CACHE_TTL_SECONDS:
+            logger.debug(f"Using cached stations for {province}")
+            stations = cached[1]
+        else:
+            stations = self.db.get_stations_by_province(province, limit=limit)
+            if stations:
+                with self._province_cache_lock:
+                    self._province_cache[key] = (now, stations)
+
+        return stations
+
+    @staticmethod
+    def _travel_cache_key(origin: Tuple[float, float],
+                          destination: Tuple[float, float]) -> Tuple[float, float, float, float]:
+        """Travel-time cache key: both endpoints rounded to 5 decimals (~1 m)"""
+        return (round(origin[0], 5), round(origin[1], 5), round(destination[0], 5), round(destination[1], 5))
+
+    def _cached_travel_time(self, origin: Tuple[float, float], destination: Tuple[float, float]) -> Dict:
+        """Get travel info between two points, memoized by rounded coordinates"""
+        key = self._travel_cache_key(origin, destination)
+        travel_info = self._tt_cache.get(key)
+        if travel_info is None:
+            travel_info = self.travel_service.get_travel_time(origin, destination)
+            self._remember_travel_time(key, travel_info)
+        return travel_info
+
+    def _remember_travel_time(self, key: Tuple[float, float, float, float], travel_info: Dict):
+        """
+        Keep a routed leg in the travel-time cache
+
+        Estimates are not kept, so a leg that fell back during a routing outage is
+        routed again once the travel service stops backing off.
+        """
+        if travel_info.get('source') not in ROUTED_TRAVEL_SOURCES:
+            return
+        with self._tt_cache_lock:
+            if key not in self._tt_cache and len(self._tt_cache) >= self.TRAVEL_CACHE_SIZE:
+                self._tt_cache.pop(next(iter(self._tt_cache)))
+            self._tt_cache[key] = travel_info
+
+    def _district_travel_time(self, origin: Tuple[float, float], destination: Tuple[float, float],
+                              origin_district: Optional[str], destination_district: str) -> Dict:
+        """
+        Get travel info between districts, memoized per district pair and rounded endpoints
+
+        A leg from home into a district also seeds that district's return leg: a day
+        that ends within RETURN_LEG_REUSE_KM of the station it entered the district at
+        needs no separate return lookup.
+        """
+        key = (origin_district or "HOME", destination_district, *self._travel_cache_key(origin, destination))
+        travel_info = self._district_travel_cache.get(key)
+        if travel_info is None and destination_district == "Home":
+            seed = self._district_return_seeds.get(origin_district)
+            if seed and self._distance_km(origin, seed[0]) <= self.RETURN_LEG_REUSE_KM:
+                return seed[1]
+        if travel_info is None:
+            travel_info = self.travel_service.get_travel_time_with_cache(
+                origin, destination, origin_district=origin_district,
+                destination_district=destination_district, home_location=self.HOME_LOCATION
+            )
+            self._district_travel_cache[key] = travel_info
+            if origin_district is None:
+                self._district_return_seeds.setdefault(destination_district, (destination, travel_info))
+        return travel_info
+
+    @staticmethod
+    def _distance_km(point_a: Tuple[float, float], point_b: Tuple[float, float]) -> float:
+        """Great-circle distance in km between two (lat, lon) points in degrees"""
+        return haversine_km_rad(*map(math.radians, (*point_a, *point_b)))
+
+    def _prefetch_travel_times(self, legs: List[Tuple[Tuple[float, float], Tuple[float, float]]]):
+        """
+        Fetch uncached (origin, destination) legs into the travel-time cache
+
+        All legs are requested as one travel-time matrix over their endpoints when the
+        routing service supports it; otherwise they are fetched concurrently leg by leg
+        (unless Config.PARALLEL_ROUTING is off, in which case the walk fetches them).
+        """
+        pending = list(dict.fromkeys(
+            leg for leg in legs if self._travel_cache_key(*leg) not in self._tt_cache
+        ))
+        if len(pending) < 2:
+            return
+
+        points = list(dict.fromkeys(point for leg in pending for point in leg))
+        matrix = self.travel_service.get_travel_time_matrix(points)
+        if matrix is not None:
+            point_index = {point: i for i, point in enumerate(points)}
+            for origin, destination in pending:
+                self._remember_travel_time(self._travel_cache_key(origin, destination),
+                                           matrix[point_index[origin]][point_index[destination]])
+            return
+
+        if not Config.PARALLEL_ROUTING:
+            return
+
+        results = self.travel_service.get_travel_times_bulk(pending, max_workers=self.TRAVEL_PREFETCH_WORKERS)
+        for leg, travel_info in zip(pending, results):
+            self._remember_travel_time(self._travel_cache_key(*leg), travel_info)
 
     def plan_with_district_optimization(self, user_input: str) -> str:
         """
@@ -46,13 +450,20 @@ class MultiDayPlanner:
         """
         try:
             # Parse user request
-            requirements = self._parse_user_request(user_input)
+            requirements = self._parse_multi_day_request(user_input)
+            if not requirements:
+                return "❌ Could not understand the request. Please specify a province and number of days."
+
             province = requirements.get('province', [])
             if isinstance(province, str):
                 province = [province]
 
             logger.info(f"Planning district-optimized inspection for: {province}")
 
+            # District legs are only reused within one plan
+            self._district_travel_cache.clear()
+            self._district_return_seeds.clear()
+
             # Get stations using custom filters
             all_stations = []
             for prov in province:
@@ -72,21 +483,34 @@ class MultiDayPlanner:
                 return "❌ No districts found with sufficient station density to be worth visiting."
 
             # Pre-compute district-to-district distances
+            # District centers: mean of every district's coordinates in one grouped reduction
             district_centers = {}
-            for analysis in worth_districts:
-                if analysis["coordinates"]:
-                    # Calculate center of district
-                    coords = analysis["coordinates"]
-                    center_lat = sum(c[0] for c in coords) / len(coords)
-                    center_lon = sum(c[1] for c in coords) / len(coords)
-                    district_centers[analysis["district"]] = (center_lat, center_lon)
+            located = [analysis for analysis in worth_districts if analysis["coordinates"]]
+            if located:
+                coords = np.array([c for analysis in located for c in analysis["coordinates"]], dtype=np.float64)
+                district_ids = np.repeat(np.arange(len(located)), [len(a["coordinates"]) for a in located])
+                group_ids, centers = group_means(coords, district_ids)
+                for group_id, (center_lat, center_lon) in zip(group_ids, centers):
+                    district_centers[located[group_id]["district"]] = (float(center_lat), float(center_lon))
+
+            # Only warm the cache for districts a day trip can reach - the box test is
+            # cheap and skips the routing calls for far-away district pairs
+            if district_centers:
+                names = list(district_centers)
+                in_reach = within_bounding_box(
+                    [district_centers[name] for name in names], self.HOME_LOCATION, self.DAY_TRIP_REACH_KM
+                )
+                if not in_reach.all():
+                    logger.info(f"Skipping pre-computation for {int((~in_reach).sum())} districts beyond "
+                                f"{self.DAY_TRIP_REACH_KM:.0f} km of home")
+                    district_centers = {name: district_centers[name] for name, keep in zip(names, in_reach) if keep}
 
             # Pre-compute distances (minimal API calls)
             logger.info("Pre-computing district distances to populate cache...")
             self.travel_service.batch_precompute_district_distances(district_centers, self.HOME_LOCATION)
 
             # Generate optimized plans by district
-            daily_plans = self._plan_by_districts(worth_districts, all_stations, requirements)
+            daily_plans = list(self._plan_by_districts(worth_districts, all_stations, requirements))
 
             # Generate response
             return self._generate_district_optimized_response(daily_plans, worth_districts, all_stations)
@@ -105,45 +529,54 @@ class MultiDayPlanner:
         total_stations = sum(len(plan["stations"]) for plan in daily_plans)
         total_days = len(daily_plans)
 
-        response = f"🎯 **District-Optimized {total_days}-Day Plan** ({total_stations} stations)\n\n"
-
-        # Add district worth summary
-        response += "📊 **District Analysis**:\n"
+        response_parts = [
+            f"🎯 **District-Optimized {total_days}-Day Plan** ({total_stations} stations)",
+            "",
+            # Add district worth summary
+            "📊 **District Analysis**:"
+        ]
         for district in worth_districts[:5]:  # Top 5 districts
-            response += f"• {district['district']}: {district['station_count']} stations (score: {district['worth_score']})\n"
-        response += "\n"
+            response_parts.append(f"• {district['district']}: {district['station_count']} stations (score: {district['worth_score']})")
+        response_parts.append("")
 
-        # Add daily plans
+        # Add daily plans (one format call per day header and per station)
+        append_part = response_parts.append
+        format_station = DISTRICT_STATION_TEMPLATE.format
         for day_num, plan in enumerate(daily_plans, 1):
             stations = plan["stations"]
-            districts = plan["districts"]
-            travel_info = plan["travel_info"]
 
-            response += f"## 📅 Day {day_num} - {len(stations)} stations\n"
-            response += f"**Districts**: {', '.join(districts)}\n"
-            response += f"**Travel**: {travel_info['total_distance']:.1f}km, {travel_info['total_time']:.1f} hours\n\n"
+            append_part(DISTRICT_DAY_HEADER_TEMPLATE.format(
+                day=day_num, station_count=len(stations), districts=', '.join(plan["districts_visited"]),
+                total_distance=plan["total_distance_km"], total_time=plan["total_time_minutes"] / 60
+            ))
 
+            last = len(stations)
             for i, station in enumerate(stations, 1):
-                district = station.get('district', 'Unknown')
-                name = station.get('name', 'Unknown Station')
-                response += f"{i}. **{name}** ({district})\n"
-
-                if i < len(stations):
-                    next_station = stations[i]
-                    if station.get('district') == next_station.get('district'):
-                        response += f"   ↳ Same district (minimal travel)\n"
-                    else:
-                        response += f"   ↳ To {next_station.get('district', 'Unknown')}\n"
+                get = station.get
+                if i == last:
+                    transition = ""
+                elif get('district') == stations[i].get('district'):
+                    transition = SAME_DISTRICT_TRANSITION
+                else:
+                    transition = f"\n   ↳ To {stations[i].get('district', 'Unknown')}"
 
-            response += "\n"
+                append_part(format_station(
+                    i=i, name=get('name', 'Unknown Station'), district=get('district', 'Unknown'),
+                    transition=transition
+                ))
+
+            append_part("")
 
         # Add optimization summary
-        response += "⚡ **Optimization Benefits**:\n"
-        response += "• Grouped stations by district to minimize travel\n"
-        response += "• Reduced API calls for same-district routing\n"
-        response += "• Prioritized high-value districts\n"
+        response_parts.extend([
+            "⚡ **Optimization Benefits**:",
+            "• Grouped stations by district to minimize travel",
+            "• Reduced API calls for same-district routing",
+            "• Prioritized high-value districts",
+            ""
+        ])
 
-        return response
+        return "\n".join(response_parts)
 
     def plan_multi_day_inspection(self, user_input: str) -> str:
         """
@@ -163,7 +596,8 @@ class MultiDayPlanner:
                 return "Sorry, I couldn't understand your multi-day inspection request. Please specify province, number of stations, and number of days."
 
             province = request_info["province"]
-            station_count = request_info["station_count"]
+            requested_stations = request_info["station_count"]
+            station_count = requested_stations  # Lowered below if fewer stations are available
             days = request_info["days"]
 
             logger.info(f"Planning {days}-day inspection: {station_count} stations in {province}")
@@ -173,7 +607,7 @@ class MultiDayPlanner:
             if isinstance(province, list):
                 # Multi-province request
                 for prov in province:
-                    stations = self.db.get_stations_by_province(prov, limit=1000)
+                    stations = self._get_province_stations(prov)
                     if stations:
                         available_stations.extend(stations)
                         logger.info(f"Found {len(stations)} stations in {prov}")
@@ -185,24 +619,23 @@ class MultiDayPlanner:
 
             else:
                 # Single province request
-                available_stations = self.db.get_stations_by_province(province, limit=1000)
+                available_stations = self._get_province_stations(province)
                 if not available_stations:
                     return f"No available stations found in {province}. Please check if the province name is correct."
 
-            # Add distances from home
-            available_stations = self.db.enrich_stations_with_distance(
-                available_stations, self.HOME_LOCATION
-            )
-
             # Limit to requested count
             if len(available_stations) < station_count:
                 station_count = len(available_stations)
                 logger.info(f"Adjusted station count to {station_count} (all available stations)")
 
-            selected_stations = available_stations[:station_count]
+            # Keep the stations closest to home (copies with distance_km, cache rows untouched)
+            selected_stations = self.db.get_nearest_stations(
+                available_stations, self.HOME_LOCATION, station_count
+            )
 
             # Plan days
-            daily_plans = self._plan_daily_routes(selected_stations, days)
+            # Evaluation and monitoring need every day, so materialize the plans here
+            daily_plans = list(self._plan_daily_routes(selected_stations, days))
 
             # Evaluate plan with fatigue and day extension analysis
             evaluation = self._evaluate_multi_day_plan(daily_plans, days, selected_stations)
@@ -212,7 +645,7 @@ class MultiDayPlanner:
 
             # Monitor plan for constraint violations and generate interventions
             monitoring_result = self.monitor_agent.monitor_plan_constraints(
-                daily_plans, request_info["station_count"], request_info["days"], user_input
+                daily_plans, requested_stations, days, user_input
             )
 
             # Check if intervention is needed
@@ -230,7 +663,7 @@ class MultiDayPlanner:
 
             # Generate normal response with evaluation and station comparison
             response = self._generate_multi_day_response(
-                daily_plans, province, evaluation, request_info["station_count"], actual_stations
+                daily_plans, province, evaluation, requested_stations, actual_stations
             )
 
             # Append optimization notice if warnings exist
@@ -247,100 +680,60 @@ class MultiDayPlanner:
     def _parse_multi_day_request(self, user_input: str) -> Optional[Dict]:
         """Parse user input for multi-day planning parameters"""
         try:
-            # Convert to lowercase for easier matching
-            input_lower = user_input.lower()
-
-            # Extract numbers
-            numbers = re.findall(r'\d+', user_input)
-
-            # Province mapping - Thai names, English names, and abbreviations
-            province_mappings = {
-                # Thai names
-                "ชัยภูมิ": "ชัยภูมิ",
-                "นครราชสีมา": "นครราชสีมา",
-                "บุรีรัมย์": "บุรีรัมย์",
-                # English names
-                "chaiyaphum": "ชัยภูมิ",
-                "nakhon ratchasima": "นครราชสีมา",
-                "nakorn ratchasima": "นครราชสีมา",
-                "nakhonratchasima": "นครราชสีมา",
-                "nakornratchasima": "นครราชสีมา",
-                "buriram": "บุรีรัมย์",
-                "buri ram": "บุรีรัมย์",
-                # Abbreviations
-                "cyp": "ชัยภูมิ",
-                "nkr": "นครราชสีมา",
-                "brr": "บุรีรัมย์"
-            }
-
-            # Find matching provinces
-            matched_provinces = []
-            for key, thai_name in province_mappings.items():
-                if key in input_lower:
-                    if thai_name not in matched_provinces:
-                        matched_provinces.append(thai_name)
-
-            # Handle multi-province requests
-            if len(matched_provinces) > 1:
-                logger.info(f"Multi-province request detected: {matched_provinces}")
-                # Use all matched provinces for multi-province planning
-                province = matched_provinces  # Pass all provinces
-                logger.info(f"Planning for multiple provinces: {province}")
-            elif len(matched_provinces) == 1:
-                province = matched_provinces[0]
-            else:
-                logger.warning(f"No valid province found in: {user_input}")
-                return None
-
-            # Determine station count and days
-            station_count = 10  # default
-            days = 1  # default
-
-            if len(numbers) >= 1:
-                station_count = int(numbers[0])
-            if len(numbers) >= 2:
-                days = int(numbers[1])
-            elif "2 day" in input_lower or "two day" in input_lower or "2day" in input_lower:
-                days = 2
-
-            logger.info(f"Parsed request: {station_count} stations in {province} for {days} days")
-
-            return {
-                "province": province,
-                "station_count": station_count,
-                "days": days,
-                "all_provinces": matched_provinces  # For future multi-province support
-            }
-
+            parsed = _parse_multi_day_fields(user_input)
         except Exception as e:
             logger.error(f"Request parsing error: {e}")
             return None
 
-    def _plan_daily_routes(self, stations: List[Dict], days: int) -> List[Dict]:
-        """Plan optimal daily routes with home return constraint"""
+        if parsed is None:
+            return None
+
+        # The cached fields are immutable; hand out fresh lists so callers can't alter the cache
+        province, station_count, days, matched_provinces = parsed
+        return {
+            "province": list(province) if isinstance(province, tuple) else province,
+            "station_count": station_count,
+            "days": days,
+            "all_provinces": list(matched_provinces)  # For future multi-province support
+        }
+
+    def _plan_daily_routes(self, stations: List[Dict], days: int) -> Iterator[Dict]:
+        """Plan optimal daily routes with home return constraint, yielding day plans in order"""
 
         # Distribute stations across days
         stations_per_day = len(stations) // days
         remainder = len(stations) % days
+        day_sizes = [stations_per_day + 1 if day < remainder else stations_per_day for day in range(days)]
 
-        daily_plans = []
-        station_index = 0
-
-        for day in range(days):
-            # Calculate stations for this day
-            day_station_count = stations_per_day
-            if day < remainder:
-                day_station_count += 1
-
-            # Get stations for this day
-            day_stations = stations[station_index:station_index + day_station_count]
-            station_index += day_station_count
-
-            # Plan route for this day
-            day_plan = self._plan_single_day_route(day_stations, day + 1)
-            daily_plans.append(day_plan)
-
-        return daily_plans
+        if days > 1 and all(s.get('lat') and s.get('long') for s in stations):
+            # One angular sector around home per day, so each day's loop covers its own
+            # area instead of overlapping rings of the distance-sorted list
+            sectors = sweep_partition([(s['lat'], s['long']) for s in stations], self.HOME_LOCATION, day_sizes)
+            day_partitions = [[stations[i] for i in sector] for sector in sectors]
+        else:
+            day_partitions = []
+            station_index = 0
+
+            for day_station_count in day_sizes:
+                # Get stations for this day
+                day_stations = stations[station_index:station_index + day_station_count]
+                station_index += day_station_count
+                day_partitions.append(day_stations)
+
+        if days <= 1:
+            for day, day_stations in enumerate(day_partitions):
+                yield self._plan_single_day_route(day_stations, day + 1)
+            return
+
+        # Days are independent once partitioned - plan them concurrently so the
+        # routing API calls of different days overlap; each day is yielded as soon
+        # as it (and every earlier day) is done. The pool is capped because every
+        # day also prefetches its legs with TRAVEL_PREFETCH_WORKERS threads, and the
+        # travel service is created here since cached_property is not thread-safe
+        self.travel_service
+        max_workers = min(days, len(day_partitions), self.MAX_PARALLEL_DAYS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            yield from executor.map(self._plan_single_day_route, day_partitions, range(1, days + 1))
 
     def _plan_single_day_route(self, stations: List[Dict], day_number: int) -> Dict:
         """Plan optimal route for a single day with time constraints"""
@@ -352,57 +745,142 @@ class MultiDayPlanner:
                 "total_distance_km": 0,
                 "total_time_minutes": 0,
                 "return_time": self.DAILY_START_TIME,
+                "return_minutes": self.DAILY_START_MINUTES,
                 "feasible": True
             }
 
-        # Start from home
-        current_pos = self.HOME_LOCATION
-        route_stations = []
-        total_distance = 0
-        total_time = 0
-
-        # Track available stations
-        remaining_stations = stations.copy()
-
-        # Start time (9:00 AM)
-        current_time_minutes = 9 * 60  # 9:00 AM in minutes
-
-        while remaining_stations:
-            # Find nearest station with same-district optimization
-            nearest_station = None
+        # Hoist loop-invariant constants and bound methods into locals
+        home = self.HOME_LOCATION
+        inspection_minutes = self.INSPECTION_TIME_MINUTES
+        lunch_minutes = self.LUNCH_DURATION_MINUTES
+        noon_minutes = self.LUNCH_START_MINUTES
+        get_travel_time = self._cached_travel_time
+        get_same_district_travel_time = self.travel_service.get_same_district_travel_time
+
+        # Track available stations by index (no list.remove / dict comparisons)
+        station_count = len(stations)
+        visited = [False] * station_count
+        remaining_count = station_count
+
+        # Read coordinates and districts out of the station dicts once; every later
+        # pass (seed, refinement, prefetch, walk) indexes these parallel lists
+        coordinates = [(s.get('lat'), s.get('long')) for s in stations]
+        districts = [s.get('district') for s in stations]
+
+        # Spatial index over stations with GPS coordinates for nearest-unvisited lookups
+        routable = [i for i, (lat, lon) in enumerate(coordinates) if lat and lon]
+        routable_positions = {station_idx: pos for pos, station_idx in enumerate(routable)}
+        nearest_index = NearestStationIndex([coordinates[i] for i in routable], home)
+        current_position = None  # Position in the index (None = home)
+
+        # Station indices per district, so the same-district check skips other districts
+        by_district = defaultdict(list)
+        for i, district in enumerate(districts):
+            by_district[district].append(i)
+
+        # Seed the visiting order greedily: same district first, otherwise nearest
+        order = []
+        leg_distances = []
+        current_district = None
+
+        while remaining_count:
+            nearest_idx = None
             min_distance = float('inf')
-            current_district = route_stations[-1].get('district') if route_stations else None
 
             # Check if there are stations in the same district first
-            same_district_stations = [s for s in remaining_stations if s.get('district') == current_district and current_district != "Unknown"] if current_district else []
+            same_district_idx = None
+            if current_district and current_district != "Unknown":
+                same_district_idx = next(
+                    (i for i in by_district.get(current_district, ()) if not visited[i]),
+                    None
+                )
 
-            if same_district_stations:
+            if same_district_idx is not None:
                 # Use first available station in same district (they're all nearby)
-                nearest_station = same_district_stations[0]
+                nearest_idx = same_district_idx
                 min_distance = 0.5  # Minimal distance for same district
                 logger.debug(f"Same district optimization: Using station in {current_district}")
             else:
                 # Find nearest station normally for different districts
-                for station in remaining_stations:
-                    if station.get('lat') and station.get('long'):
-                        station_pos = (station['lat'], station['long'])
-                        distance = haversine(current_pos, station_pos, unit=Unit.KILOMETERS)
-
-                        if distance < min_distance:
-                            min_distance = distance
-                            nearest_station = station
+                position, distance = nearest_index.nearest(current_position)
+                if position is not None:
+                    nearest_idx = routable[position]
+                    min_distance = distance
 
-            if not nearest_station:
+            if nearest_idx is None:
                 break
 
+            order.append(nearest_idx)
+            leg_distances.append(min_distance)
+
+            current_district = districts[nearest_idx]
+            current_position = routable_positions.get(nearest_idx)
+            visited[nearest_idx] = True
+            remaining_count -= 1
+            if current_position is not None:
+                nearest_index.mark_visited(current_position)
+
+        # Improve the greedy order (exact for small days, 2-opt otherwise)
+        if len(order) > 1 and all(idx in routable_positions for idx in order):
+            positions = [routable_positions[idx] for idx in order]
+            cost = self._route_cost_matrix(nearest_index, [districts[i] for i in routable])
+            refined = [row - 1 for row in optimize_tour([pos + 1 for pos in positions], cost)]
+
+            if refined != positions:
+                logger.debug(f"Day {day_number}: Refined route from {tour_length([p + 1 for p in positions], cost):.1f} "
+                             f"to {tour_length([p + 1 for p in refined], cost):.1f} km")
+                order = [routable[pos] for pos in refined]
+                leg_distances = []
+                previous_position = None
+                previous_district = None
+                for pos, station_idx in zip(refined, order):
+                    district = districts[station_idx]
+                    if district and district != "Unknown" and district == previous_district:
+                        leg_distances.append(0.5)
+                    else:
+                        leg_distances.append(nearest_index.distance(previous_position, pos))
+                    previous_position = pos
+                    previous_district = district
+
+        # Every routed leg is known now - fetch outbound and return legs concurrently
+        # instead of one blocking request at a time inside the walk
+        legs = []
+        previous_coords = home
+        for station_idx, leg_distance in zip(order, leg_distances):
+            coords = coordinates[station_idx]
+            if leg_distance > 0.5:
+                legs.append((previous_coords, coords))
+                legs.append((coords, home))
+            previous_coords = coords
+        if order:
+            legs.append((previous_coords, home))
+        self._prefetch_travel_times(legs)
+
+        # Walk the route from home, timing each leg
+        current_pos = home
+        route_stations = []
+        total_distance = 0
+        total_time = 0
+
+        # Start time (9:00 AM)
+        current_time_minutes = self.DAILY_START_MINUTES
+
+        # Routed return leg of the latest station (None after a same-district hop)
+        return_info = None
+
+        for nearest_idx, min_distance in zip(order, leg_distances):
+            nearest_station = stations[nearest_idx]
+
             # Calculate travel time with same-district optimization
-            station_coords = (nearest_station['lat'], nearest_station['long'])
+            station_coords = coordinates[nearest_idx]
 
             if min_distance <= 0.5:  # Same district optimization
                 # Use optimized travel service method for same district
-                travel_info = self.travel_service.get_same_district_travel_time()
+                travel_info = get_same_district_travel_time()
                 travel_time = travel_info['duration_minutes']
 
+                return_info = None
+
                 # For same district, assume similar return time as previous station if available
                 if route_stations:
                     return_time = route_stations[-1].get('return_time_minutes', 45.0)  # Use previous or default
@@ -411,31 +889,19 @@ class MultiDayPlanner:
                 logger.debug(f"Same district: skipping API calls for {nearest_station.get('name', 'station')}")
             else:
                 # Calculate accurate travel time using routing service for different districts
-                travel_info = self.travel_service.get_travel_time(current_pos, station_coords)
+                travel_info = get_travel_time(current_pos, station_coords)
                 travel_time = travel_info['duration_minutes']
 
                 # Calculate return journey time from this station using routing service
-                return_info = self.travel_service.get_travel_time(station_coords, self.HOME_LOCATION)
+                return_info = get_travel_time(station_coords, home)
                 return_time = return_info['duration_minutes']
 
-            station_time = self.INSPECTION_TIME_MINUTES
-
-            # Calculate time after this station including lunch break
-            time_after_station = current_time_minutes + travel_time + station_time
-
-            # Add lunch break if we cross 12:00 PM
-            lunch_added = False
-            if current_time_minutes < (12 * 60) and time_after_station >= (12 * 60):
-                time_after_station += self.LUNCH_DURATION_MINUTES
-                lunch_added = True
-
-            # Add return journey time and safety buffer
-            final_time = time_after_station + return_time + self.SAFETY_BUFFER_MINUTES
+            # Travel + inspection for this stop, and whether it crosses 12:00 PM
+            leg_time = travel_time + inspection_minutes
+            lunch_added = current_time_minutes < noon_minutes <= current_time_minutes + leg_time
 
             # Removed 17:00 time constraint - user gets all requested stations
-            # if final_time > (17 * 60):  # 17:00 in minutes
-            #     logger.info(f"Day {day_number}: Stopping at {len(route_stations)} stations due to time constraint")
-            #     break
+            # (was: time after station + return_time + SAFETY_BUFFER_MINUTES > 17 * 60 -> break)
 
             # Add station to route
             nearest_station['travel_distance_km'] = round(min_distance, 2)
@@ -445,25 +911,24 @@ class MultiDayPlanner:
 
             # Update totals
             total_distance += min_distance
-            total_time += travel_time + station_time
-            current_time_minutes += travel_time + station_time
+            total_time += leg_time
+            current_time_minutes += leg_time
 
             # Add lunch break time if we crossed 12:00 PM
             if lunch_added:
-                total_time += self.LUNCH_DURATION_MINUTES
-                current_time_minutes += self.LUNCH_DURATION_MINUTES
+                total_time += lunch_minutes
+                current_time_minutes += lunch_minutes
                 logger.info(f"Day {day_number}: Added lunch break after station {len(route_stations)}")
 
-            # Update position and remove station
-            current_pos = (nearest_station['lat'], nearest_station['long'])
-            remaining_stations.remove(nearest_station)
+            # Update position
+            current_pos = station_coords
 
         # Calculate return journey
         if route_stations:
-            last_station = route_stations[-1]
-            # Calculate accurate travel time to return home
-            last_station_coords = (last_station['lat'], last_station['long'])
-            return_info = self.travel_service.get_travel_time(last_station_coords, self.HOME_LOCATION)
+            # Calculate accurate travel time to return home (already routed in the walk
+            # unless the last stop was a same-district hop)
+            if return_info is None:
+                return_info = get_travel_time(current_pos, home)
             return_distance = return_info['distance_km']
             return_time = return_info['duration_minutes']
 
@@ -471,11 +936,11 @@ class MultiDayPlanner:
             total_time += return_time
 
             # Calculate return arrival time
-            final_time_minutes = current_time_minutes + return_time
-            return_hours = int(final_time_minutes // 60)
-            return_mins = int(final_time_minutes % 60)
+            return_minutes = int(current_time_minutes + return_time)
+            return_hours, return_mins = divmod(return_minutes, 60)
             return_time_str = f"{return_hours:02d}:{return_mins:02d}"
         else:
+            return_minutes = self.DAILY_START_MINUTES
             return_time_str = self.DAILY_START_TIME
 
         return {
@@ -484,18 +949,29 @@ class MultiDayPlanner:
             "total_distance_km": round(total_distance, 2),
             "total_time_minutes": round(total_time, 1),
             "return_time": return_time_str,
+            "return_minutes": return_minutes,  # Arrival time as minutes since midnight
             "feasible": len(route_stations) > 0 or len(stations) == 0
         }
 
+    @staticmethod
+    def _route_cost_matrix(nearest_index: NearestStationIndex, districts: List[Optional[str]]) -> np.ndarray:
+        """
+        Cost matrix for route refinement, matching how legs are priced when walking
+        the route: same-district hops count as 0.5 km, everything else is haversine
+        """
+        district_codes: Dict[str, int] = {}
+        codes = np.array([-1] + [
+            district_codes.setdefault(d, len(district_codes)) if d and d != "Unknown" else -1
+            for d in districts
+        ])
+        same_district = (codes[:, np.newaxis] == codes[np.newaxis, :]) & (codes[:, np.newaxis] >= 0)
+        return np.where(same_district, 0.5, nearest_index.distances.astype(np.float64))
+
     def _evaluate_multi_day_plan(self, daily_plans: List[Dict], requested_days: int, all_stations: List[Dict]) -> Dict[str, Any]:
         """Evaluate the multi-day plan for fatigue and safety"""
         try:
-            from ..services.plan_evaluator import PlanEvaluationAgent
-
-            evaluator = PlanEvaluationAgent()
-
             # Use all stations for route evaluation
-            evaluation = evaluator.evaluate_plan(
+            evaluation = self.evaluator.evaluate_plan(
                 stations=all_stations,
                 start_location=self.HOME_LOCATION,
                 route_info={},
@@ -521,21 +997,17 @@ class MultiDayPlanner:
             logger.error(f"Plan evaluation failed: {e}")
             return {"is_optimal": True, "score": 75, "error": str(e)}
 
-    def _generate_multi_day_response(self, daily_plans: List[Dict], province, evaluation: Optional[Dict] = None,
+    def _generate_multi_day_response(self, daily_plans: Iterable[Dict], province, evaluation: Optional[Dict] = None,
                                    requested_stations: Optional[int] = None, actual_stations: Optional[int] = None) -> str:
         """Generate formatted multi-day inspection plan response with station comparison"""
 
-        response_parts = []
-
         # Handle multiple provinces in title
-        if isinstance(province, list):
-            province_str = " & ".join(province)
-            response_parts.append(f"# Multi-Day FM Station Inspection Plan - {province_str}")
-        else:
-            response_parts.append(f"# Multi-Day FM Station Inspection Plan - {province}")
+        province_str = " & ".join(province) if isinstance(province, list) else province
 
-        response_parts.append(f"**Home Base**: {self.HOME_LOCATION[0]:.6f}, {self.HOME_LOCATION[1]:.6f}")
-        response_parts.append("")
+        response_parts = [
+            f"# Multi-Day FM Station Inspection Plan - {province_str}\n"
+            f"**Home Base**: {self.HOME_LOCATION[0]:.6f}, {self.HOME_LOCATION[1]:.6f}\n"
+        ]
 
         overall_stats = {
             "total_stations": 0,
@@ -543,59 +1015,66 @@ class MultiDayPlanner:
             "total_time": 0
         }
 
+        append_part = response_parts.append
+        format_station = STATION_TEMPLATE.format
+        day_count = 0
+
         for day_plan in daily_plans:
+            day_count += 1
             day_num = day_plan["day"]
             stations = day_plan["stations"]
 
-            response_parts.append(f"## Day {day_num} Plan ({len(stations)} stations)")
-            response_parts.append("")
+            response_parts.append(f"## Day {day_num} Plan ({len(stations)} stations)\n")
 
             if not stations:
-                response_parts.append("No stations planned for this day.")
-                response_parts.append("")
+                response_parts.append("No stations planned for this day.\n")
                 continue
 
-            # List stations
+            # List stations (one formatted block per station, dict.get bound once per station)
             for i, station in enumerate(stations, 1):
-                response_parts.append(f"{i}. **Station Name**: {station.get('name', 'Unknown')}")
-                response_parts.append(f"   - **Frequency**: {station.get('freq', 'Unknown')} MHz")
-                response_parts.append(f"   - **Province**: {station.get('province', 'Unknown')}")
-                response_parts.append(f"   - **District**: {station.get('district', 'Unknown')}")
-                response_parts.append(f"   - **Distance**: {station.get('travel_distance_km', 0)} km from previous location")
-                response_parts.append(f"   - **Travel Time**: {station.get('travel_time_minutes', 0)} minutes")
-                response_parts.append("")
+                get = station.get
+                append_part(format_station(
+                    i=i,
+                    name=get('name', 'Unknown'),
+                    freq=get('freq', 'Unknown'),
+                    province=get('province', 'Unknown'),
+                    district=get('district', 'Unknown'),
+                    distance_km=get('travel_distance_km', 0),
+                    travel_minutes=get('travel_time_minutes', 0)
+                ))
 
             # Day summary
-            response_parts.append(f"**Day {day_num} Summary:**")
-            response_parts.append(f"- **Start Time**: {self.DAILY_START_TIME}")
-            response_parts.append(f"- **Lunch Break**: {self.LUNCH_START_TIME} - {self.LUNCH_END_TIME} (1 hour)")
-            response_parts.append(f"- **Total Distance**: {day_plan['total_distance_km']} km")
-            response_parts.append(f"- **Travel Time**: {day_plan['total_time_minutes']} minutes")
-            response_parts.append(f"- **Inspection Time**: {len(stations) * self.INSPECTION_TIME_MINUTES} minutes")
-            response_parts.append(f"- **Return Home Time**: {day_plan['return_time']} (estimated arrival time)")
-            response_parts.append(f"- **Estimated Return**: Will arrive home at {day_plan['return_time']}")
-
-            if day_plan['return_time'] > "17:00":
-                response_parts.append(f"- **⚠️ Warning**: Return time exceeds 17:00 limit")
+            if day_plan['return_minutes'] > self.DAILY_END_MINUTES:
+                status_line = "- **⚠️ Warning**: Return time exceeds 17:00 limit"
             else:
-                response_parts.append(f"- **✅ Status**: Within time constraints")
-
-            response_parts.append("")
+                status_line = "- **✅ Status**: Within time constraints"
+
+            response_parts.append(DAY_SUMMARY_TEMPLATE.format(
+                day=day_num,
+                start_time=self.DAILY_START_TIME,
+                lunch_start=self.LUNCH_START_TIME,
+                lunch_end=self.LUNCH_END_TIME,
+                total_distance_km=day_plan['total_distance_km'],
+                total_time_minutes=day_plan['total_time_minutes'],
+                inspection_minutes=len(stations) * self.INSPECTION_TIME_MINUTES,
+                return_time=day_plan['return_time'],
+                status_line=status_line
+            ))
 
             # Update overall stats
             overall_stats["total_stations"] += len(stations)
             overall_stats["total_distance"] += day_plan["total_distance_km"]
             overall_stats["total_time"] += day_plan["total_time_minutes"]
 
-        # Overall summary
-        response_parts.append("## Overall Summary")
-        response_parts.append(f"- **Total Stations**: {overall_stats['total_stations']}")
-
-        # Station shortfall notice removed - user gets what they request
-
-        response_parts.append(f"- **Total Distance**: {overall_stats['total_distance']} km (over {len(daily_plans)} days)")
-        response_parts.append(f"- **Total Time**: {overall_stats['total_time']} minutes")
-        response_parts.append(f"- **Average per Day**: {overall_stats['total_stations'] // len(daily_plans)} stations, {overall_stats['total_distance'] / len(daily_plans):.1f} km")
+        # Overall summary (station shortfall notice removed - user gets what they request)
+        response_parts.append(
+            "## Overall Summary\n"
+            f"- **Total Stations**: {overall_stats['total_stations']}\n"
+            f"- **Total Distance**: {overall_stats['total_distance']} km (over {day_count} days)\n"
+            f"- **Total Time**: {overall_stats['total_time']} minutes\n"
+            f"- **Average per Day**: {overall_stats['total_stations'] // day_count} stations, "
+            f"{overall_stats['total_distance'] / day_count:.1f} km"
+        )
 
 
         return "\n".join(response_parts)
@@ -676,18 +1155,18 @@ class MultiDayPlanner:
     def handle_user_intervention_response(self, user_response: str, context: Dict[str, Any]) -> str:
         """Handle user response to intervention messages"""
 
-        response_lower = user_response.lower().strip()
+        action = classify_intervention(user_response)
 
-        if any(phrase in response_lower for phrase in ['fix it', 'auto fix', 'fix automatically', 'implement fix']):
+        if action == "auto_fix":
             return self._execute_auto_fix(context)
 
-        elif any(phrase in response_lower for phrase in ['show options', 'see options', 'alternatives']):
+        elif action == "show_options":
             return self._show_fix_alternatives(context)
 
-        elif any(phrase in response_lower for phrase in ['ignore', 'proceed anyway', 'keep plan', 'ignore warnings']):
+        elif action == "ignore_warnings":
             return self._handle_ignore_warnings(context)
 
-        elif any(phrase in response_lower for phrase in ['optimize', 'improve', 'make better']):
+        elif action == "optimize":
             return self._execute_optimization(context)
 
         else:
@@ -713,21 +1192,15 @@ class MultiDayPlanner:
                 )
 
                 if fix_result["success"]:
-                    new_request = fix_result["new_request"]
-
-                    return f"""🔧 **AUTO-FIX APPLIED!**
-
-{fix_result['user_message']}
-
-**🎯 Executing new request**: {new_request}
-
-Processing your optimized plan..."""
+                    return AUTO_FIX_APPLIED_TEMPLATE.format(
+                        user_message=fix_result['user_message'], new_request=fix_result["new_request"]
+                    )
 
-            return "✅ Auto-fix completed! Generating your improved plan..."
+            return AUTO_FIX_COMPLETED_MESSAGE
 
         except Exception as e:
             logger.error(f"Auto-fix execution error: {e}")
-            return "❌ Auto-fix failed. Please try manual adjustments."
+            return AUTO_FIX_FAILED_MESSAGE
 
     def _show_fix_alternatives(self, context: Dict[str, Any]) -> str:
         """Show alternative fix options"""
@@ -737,130 +1210,144 @@ Processing your optimized plan..."""
 
         alternatives = self.auto_fix_agent.create_alternative_fixes(original_request, monitoring_result)
 
-        response_parts = [
-            "🔧 **ALTERNATIVE FIX OPTIONS**",
-            "",
-            "Choose the best solution for your needs:",
-            ""
-        ]
-
-        for i, alt in enumerate(alternatives, 1):
-            response_parts.extend([
-                f"**{i}. {alt['title']}**",
-                f"   {alt['description']}",
-                f"   ✅ Benefits: {', '.join(alt['benefits'])}",
-                f"   ⚠️ Trade-offs: {', '.join(alt['trade_offs'])}",
-                ""
-            ])
-
-        response_parts.extend([
-            "**Quick responses:**",
-            "- Type '1' for the first option",
-            "- Type '2' for the second option",
-            "- Type '3' for the third option (if available)",
-            "- Type 'back' to return to auto-fix"
-        ])
-
-        return "\n".join(response_parts)
+        return FIX_ALTERNATIVES_HEADER + "".join(
+            FIX_ALTERNATIVE_TEMPLATE.format(
+                i=i, title=alt['title'], description=alt['description'],
+                benefits=', '.join(alt['benefits']), trade_offs=', '.join(alt['trade_offs'])
+            )
+            for i, alt in enumerate(alternatives, 1)
+        ) + FIX_ALTERNATIVES_FOOTER
 
     def _handle_ignore_warnings(self, context: Dict[str, Any]) -> str:
         """Handle user choosing to ignore warnings"""
 
-        return """⚠️ **PROCEEDING WITH RISKY PLAN**
-
-You've chosen to proceed despite safety warnings. Please note:
-
-🚨 **Risks acknowledged:**
-- Potential inspector fatigue
-- Safety concerns with long driving days
-- Possible quality reduction due to time pressure
-
-✅ **Your original plan will be used as-is**
-
-**Safety reminders:**
-- Take regular breaks during long drives
-- Don't hesitate to stop if feeling tired
-- Consider splitting difficult days if needed
-
-Proceeding with your original request..."""
+        return IGNORE_WARNINGS_MESSAGE
 
     def _execute_optimization(self, context: Dict[str, Any]) -> str:
         """Execute plan optimization for warning-level issues"""
 
-        return """💡 **PLAN OPTIMIZATION STARTED**
-
-🔄 Analyzing your plan for efficiency improvements...
-
-**Optimization targets:**
-- Route sequence efficiency
-- Travel time reduction
-- Workload balancing
-- Fatigue minimization
-
-Generating your optimized plan..."""
+        return OPTIMIZATION_STARTED_MESSAGE
 
     def _show_intervention_help(self) -> str:
         """Show help for intervention responses"""
 
-        return """💭 **INTERVENTION OPTIONS**
-
-I didn't understand your response. Here are your options:
-
-**🔧 For automatic fixes:**
-- Type **'fix it'** - Apply best automatic solution
-- Type **'show options'** - See all available fixes
-
-**⚡ For optimization:**
-- Type **'optimize'** - Improve plan efficiency
-
-**⚠️ To proceed anyway:**
-- Type **'ignore warnings'** - Keep risky plan
-
-**❓ Need help:**
-- Type **'explain'** - Get detailed explanation
+        return INTERVENTION_HELP_MESSAGE
 
-What would you like to do?"""
-
-    def _plan_by_districts(self, worth_districts: List[Dict], all_stations: List[Dict], requirements: Dict) -> List[Dict]:
-        """Plan route by processing districts in worth order with minimal API calls"""
-        daily_plans = []
+    def _plan_by_districts(self, worth_districts: List[Dict], all_stations: List[Dict], requirements: Dict) -> Iterator[Dict]:
+        """Plan route by processing districts in worth order with minimal API calls, yielding each day"""
         remaining_districts = worth_districts.copy()
         requested_days = requirements.get('days', 2)
 
+        # Group stations by district once instead of filtering all stations per district per day,
+        # with each station's (lat, long) in a parallel list so station dicts stay untouched
+        stations_by_district = defaultdict(list)
+        coords_by_district = defaultdict(list)
+        for station in all_stations:
+            district = station.get('district')
+            stations_by_district[district].append(station)
+            coords_by_district[district].append((station.get('lat'), station.get('long')))
+
         for day in range(1, requested_days + 1):
             if not remaining_districts:
                 break
 
-            day_plan = self._plan_single_day_by_districts(day, remaining_districts, all_stations)
-            daily_plans.append(day_plan)
+            day_plan = self._plan_single_day_by_districts(
+                day, remaining_districts, stations_by_district, coords_by_district
+            )
+            yield day_plan
 
-            # Remove completed districts
-            completed_districts = [s.get('district') for s in day_plan['stations']]
+            # Remove completed districts (set membership instead of scanning the day's stations)
+            completed_districts = {s.get('district') for s in day_plan['stations']}
             remaining_districts = [d for d in remaining_districts if d['district'] not in completed_districts]
 
-        return daily_plans
+    def _count_fitting_stations(self, station_count: int, start_minutes: float, lunch_added: bool,
+                                first_leg_minutes: float, first_check_minutes: float,
+                                same_district_minutes: float) -> int:
+        """
+        Count how many consecutive district stations can start before 4 PM
 
-    def _plan_single_day_by_districts(self, day_number: int, available_districts: List[Dict], all_stations: List[Dict]) -> Dict:
-        """Plan a single day focusing on complete districts to minimize travel between districts"""
-        current_pos = self.HOME_LOCATION
-        current_time_minutes = 9 * 60  # 9:00 AM
+        The first station travels first_leg_minutes and is checked against
+        first_check_minutes; the rest are same-district hops. A lunch break is added
+        after the first station that ends at or past noon, unless lunch_added.
+
+        Every hop after the first station costs the same, so the clock is an arithmetic
+        series split in two by lunch and the count is closed-form instead of a loop.
+        """
+        day_end = self.DISTRICT_LAST_START_MINUTES
+        noon = self.LUNCH_START_MINUTES
+        inspection_minutes = self.INSPECTION_TIME_MINUTES
+        lunch_minutes = self.LUNCH_DURATION_MINUTES
+        hop_minutes = same_district_minutes + inspection_minutes
+
+        if station_count <= 0 or start_minutes + first_check_minutes >= day_end:
+            return 0
+
+        # Clock after the first station; hop k (k >= 1) fits while clock + k * hop < day_end
+        clock = start_minutes + first_leg_minutes + inspection_minutes
+        if not lunch_added and clock >= noon:
+            clock += lunch_minutes
+            lunch_added = True
+
+        # Number of k >= 1 with clock + k * hop < limit
+        def hops_before(limit):
+            return max(0, -(-(limit - clock) // hop_minutes) - 1)
+
+        hops = hops_before(day_end)
+        if not lunch_added:
+            # Lunch follows hop j, the first one ending at or past noon; later hops start an hour later
+            lunch_hop = max(1, -(-(noon - clock) // hop_minutes))
+            if hops >= lunch_hop:
+                hops = max(lunch_hop, hops_before(day_end - lunch_minutes))
+
+        return int(min(station_count, 1 + hops))
+
+    def _plan_single_day_by_districts(self, day_number: int, available_districts: List[Dict],
+                                      stations_by_district: Dict[str, List[Dict]],
+                                      coords_by_district: Dict[str, List[Tuple[float, float]]],
+                                      early_terminate_day: bool = True) -> Dict:
+        """
+        Plan a single day focusing on complete districts to minimize travel between districts
+
+        coords_by_district holds each district's station (lat, long) in the same order
+        as stations_by_district.
+
+        Once a station no longer fits after the day has started, later districts are
+        checked against the same clock and leg time and cannot fit either, so by default
+        the day ends there. Pass early_terminate_day=False to scan every district anyway.
+        """
+        # Hoist class constants read in the district/station loops into locals
+        home = self.HOME_LOCATION
+        station_time = self.INSPECTION_TIME_MINUTES
+        lunch_minutes = self.LUNCH_DURATION_MINUTES
+        noon_minutes = self.LUNCH_START_MINUTES
+
+        current_pos = home
+        current_time_minutes = self.DAILY_START_MINUTES
         route_stations = []
         total_distance = 0
         total_time = 0
         lunch_added = False
-        processed_districts = set()
+        districts_visited = []
+        day_full = False
+
+        # Same-district legs are a fixed estimate - look it up once per day. The day clock
+        # runs in whole minutes, so leg durations are rounded once where they are read
+        same_district_info = self.travel_service.get_same_district_travel_time()
+        same_district_minutes = round(same_district_info['duration_minutes'])
+        same_district_km = same_district_info['distance_km']
 
         logger.info(f"Day {day_number}: Planning with {len(available_districts)} available districts")
 
         # Process districts in worth order
         for district_analysis in available_districts:
-            district_name = district_analysis['district']
+            if day_full:
+                break
 
-            if district_name in processed_districts:
-                continue
+            district_name = district_analysis['district']
 
             # Get stations for this district
-            district_stations = [s for s in all_stations if s.get('district') == district_name]
+            district_stations = stations_by_district.get(district_name, ())
+            district_coords = coords_by_district.get(district_name, ())
 
             if not district_stations:
                 continue
@@ -869,110 +1356,81 @@ What would you like to do?"""
 
             # Use cached travel time to district
             if district_stations:
-                first_station = district_stations[0]
-                station_coords = (first_station.get('lat'), first_station.get('long'))
+                station_coords = district_coords[0]
 
                 # Get travel time to district using cache
-                travel_info = self.travel_service.get_travel_time_with_cache(
-                    current_pos, station_coords, origin_district=None,
-                    destination_district=district_name, home_location=self.HOME_LOCATION
-                )
+                origin_district = route_stations[-1].get('district') if route_stations else None
+                travel_info = self._district_travel_time(current_pos, station_coords, origin_district, district_name)
 
-                travel_to_district = travel_info['duration_minutes']
+                travel_to_district = round(travel_info['duration_minutes'])
+                travel_to_district_km = travel_info['distance_km']
 
-                # Add all stations in this district (use minimal distances between them)
-                district_added = False
-                for station in district_stations:
-                    station_time = self.INSPECTION_TIME_MINUTES
+                # How many of this district's stations fit before 4 PM
+                first_check_minutes = (same_district_minutes if route_stations else travel_to_district) + station_time
+                fit_count = self._count_fitting_stations(
+                    len(district_stations), current_time_minutes, lunch_added,
+                    travel_to_district, first_check_minutes, same_district_minutes
+                )
 
-                    if not route_stations:
-                        time_for_station = travel_to_district + station_time
-                    else:
-                        same_district_info = self.travel_service.get_same_district_travel_time()
-                        time_for_station = same_district_info['duration_minutes'] + station_time
-
-                    # Check if we have time
-                    if current_time_minutes + time_for_station < 16 * 60:  # Before 4 PM
-                        if not district_added:
-                            total_distance += travel_info['distance_km']
-                            total_time += travel_to_district
-                            current_time_minutes += travel_to_district
-                            district_added = True
-                        else:
-                            same_district_info = self.travel_service.get_same_district_travel_time()
-                            total_distance += same_district_info['distance_km']
-                            total_time += same_district_info['duration_minutes']
-                            current_time_minutes += same_district_info['duration_minutes']
-
-                        # Add station
-                        station['travel_distance_km'] = same_district_info['distance_km'] if district_added else travel_info['distance_km']
-                        station['travel_time_minutes'] = same_district_info['duration_minutes'] if district_added else travel_info['duration_minutes']
-                        route_stations.append(station)
-
-                        total_time += station_time
-                        current_time_minutes += station_time
-                        current_pos = (station.get('lat'), station.get('long'))
-
-                        # Add lunch break if needed
-                        if not lunch_added and current_time_minutes >= 12 * 60:
-                            total_time += self.LUNCH_DURATION_MINUTES
-                            current_time_minutes += self.LUNCH_DURATION_MINUTES
-                            lunch_added = True
+                # Add the stations that fit (use minimal distances between them); the count is
+                # known up front, so the route grows by one extend per district
+                fitting_stations = district_stations[:fit_count]
+                district_added = False
+                for station, coords in zip(fitting_stations, district_coords):
+                    if not district_added:
+                        leg_km = travel_to_district_km
+                        leg_minutes = travel_to_district
+                        district_added = True
                     else:
-                        break
+                        leg_km = same_district_km
+                        leg_minutes = same_district_minutes
+
+                    total_distance += leg_km
+                    total_time += leg_minutes
+                    current_time_minutes += leg_minutes
+
+                    # Annotate station (first station of a district carries the inter-district leg)
+                    station['travel_distance_km'] = leg_km
+                    station['travel_time_minutes'] = leg_minutes
+
+                    total_time += station_time
+                    current_time_minutes += station_time
+                    current_pos = coords
+
+                    # Add lunch break if needed
+                    if not lunch_added and current_time_minutes >= noon_minutes:
+                        total_time += lunch_minutes
+                        current_time_minutes += lunch_minutes
+                        lunch_added = True
+
+                route_stations.extend(fitting_stations)
+
+                if fit_count < len(district_stations):
+                    day_full = early_terminate_day and bool(route_stations)
 
                 if district_added:
-                    processed_districts.add(district_name)
+                    districts_visited.append(district_name)
 
         # Calculate return journey
         if route_stations:
-            last_station_coords = (route_stations[-1].get('lat'), route_stations[-1].get('long'))
-            return_info = self.travel_service.get_travel_time_with_cache(
-                last_station_coords, self.HOME_LOCATION,
-                origin_district=route_stations[-1].get('district'),
-                destination_district="Home", home_location=self.HOME_LOCATION
+            # current_pos is the last station's (lat, long)
+            return_info = self._district_travel_time(
+                current_pos, home, route_stations[-1].get('district'), "Home"
             )
-            return_time = return_info['duration_minutes']
+            return_time = round(return_info['duration_minutes'])
             total_distance += return_info['distance_km']
             total_time += return_time
-            final_return_time_minutes = current_time_minutes + return_time
-            return_time_str = f"{int(final_return_time_minutes//60):02d}:{int(final_return_time_minutes%60):02d}"
+            return_minutes = current_time_minutes + return_time
+            return_hours, return_mins = divmod(return_minutes, 60)
+            return_time_str = f"{return_hours:02d}:{return_mins:02d}"
         else:
-            return_time_str = "09:00"
+            return_minutes = self.DAILY_START_MINUTES
+            return_time_str = self.DAILY_START_TIME
 
         return {
             "day": day_number, "stations": route_stations,
             "total_distance_km": round(total_distance, 2),
             "total_time_minutes": round(total_time, 1),
-            "return_time": return_time_str, "lunch_break": lunch_added,
-            "districts_visited": list(processed_districts)
+            "return_time": return_time_str, "return_minutes": return_minutes,
+            "lunch_break": lunch_added, "districts_visited": districts_visited
         }
-
-def test_multi_day_planner():
-    """Test the multi-day planner"""
-    planner = MultiDayPlanner()
-
-    # Test request
-    test_input = "find me 10 stations in ชัยภูมิ i want to go 2 day make a plan for me"
-
-    print("Testing multi-day planner...")
-    print(f"Input: {test_input}")
-    print("\nResult:")
-    result = planner.plan_multi_day_inspection(test_input)
-    print(result)
-
-def test_multi_day_planner():
-    """Test the multi-day planner"""
-    planner = MultiDayPlanner()
-
-    # Test with district optimization
-    test_input = "find me 15 stations in ชัยภูมิ i want to go 2 day make a plan for me"
-
-    print("Testing district-optimized multi-day planner...")
-    print(f"Input: {test_input}")
-    print("\nResult:")
-    result = planner.plan_with_district_optimization(test_input)
-    print(result)
-
-if __name__ == "__main__":
-    test_multi_day_planner()
\ No newline at end of file
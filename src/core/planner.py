@@ -1,67 +1,177 @@
 """Main FM Station Inspection Planner using LangGraph"""
 
+from __future__ import annotations
+
 import logging
-from typing import Optional, Tuple
-from langgraph.graph import StateGraph, START, END
-from .agents import (
-    FMStationState,
-    language_processing_node,
-    location_processing_node,
-    database_query_node,
-    route_planning_node,
-    response_generation_node,
-    location_based_planning_node,
-    step_by_step_planning_node,
-    multi_day_planning_node,
-    detect_location_based_request,
-    detect_step_by_step_request,
-    should_continue_after_stations,
-    check_for_errors,
-    error_response_node
-)
+import threading
+from functools import wraps
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from ..config.config import Config
-from ..services.location_choice_service import LocationChoiceService
+
+# LangGraph and the node modules (LLM, database and geocoding clients) are imported
+# when the workflow is first built, so importing this module stays cheap
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+    from .agents import FMStationState
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EXIT_COMMANDS = frozenset({'exit', 'quit'})  # Typed at any prompt to leave the interactive planner
+NO_RESPONSE_MESSAGE = "Sorry, an error occurred during processing"  # Workflow ended without a response
+
+# Interactive console output, each written with one print instead of a print per line
+SEPARATOR = "=" * 60
+RULE = "-" * 60
+WELCOME_BANNER = (
+    f"{SEPARATOR}\n"
+    "FM Station Inspection Planner\n"
+    f"{SEPARATOR}\n"
+    "Welcome to the FM Station Inspection Planning System\n"
+    "Type 'exit' or 'quit' to exit the program\n"
+    f"{RULE}"
+)
+PLAN_RESPONSE_TEMPLATE = f"\n{SEPARATOR}\nInspection Plan:\n{RULE}\n{{response}}\n{SEPARATOR}"
+CONSOLE_LOCATION_NOTICE = (
+    "\n📱 For console mode, I'll use NBTC23 base location instead.\n"
+    "(In a real bot, you would share your GPS location)"
+)
+
+# Most requests a node may run at once across concurrent invocations (batch mode), so
+# the nodes calling external services don't flood them
+DATABASE_NODE_CONCURRENCY = 4  # Station queries against Supabase
+ROUTING_NODE_CONCURRENCY = 2   # Multi-day planning (database plus routing API per leg)
+
+
+def _limit_concurrency(node, limit: int):
+    """Wrap a node so at most limit calls of it run at the same time"""
+    semaphore = threading.BoundedSemaphore(limit)
+
+    @wraps(node)
+    def limited_node(state):
+        with semaphore:
+            return node(state)
+
+    return limited_node
+
+
+def _success_only_cache():
+    """
+    In-memory node cache that skips writes of nodes that reported errors
+
+    A location lookup that fell back to Bangkok (location_fallback) is not kept
+    either, so the next request for that province tries geocoding again.
+    """
+    from langgraph.cache.memory import InMemoryCache
+
+    class SuccessOnlyCache(InMemoryCache):
+        def set(self, keys):
+            super().set({
+                key: (writes, ttl) for key, (writes, ttl) in keys.items()
+                if not any(channel == "errors" or (channel == "location_fallback" and value)
+                           for channel, value in writes)
+            })
+
+    return SuccessOnlyCache()
+
+
+def _requested_province(state: FMStationState) -> str:
+    """Cache key for location processing: the only input it reads is the parsed province"""
+    location = (state.get("requirements") or {}).get("location") or {}
+    return str(location.get("province"))
+
+
 class FMStationPlanner:
     """Main orchestrator for FM station inspection planning using LangGraph"""
 
+    BATCH_MAX_CONCURRENCY = 8  # Requests run at once by plan_inspection_batch
+
+    # The compiled graph is identical for every planner, so it is built once and shared
+    _workflow = None
+    _workflow_lock = threading.Lock()
+    _workflow_png = None  # Rendered diagram of the shared workflow (see get_workflow_visualization)
+
     def __init__(self):
         """Initialize the planner with LangGraph workflow"""
 
-        # Build the LangGraph workflow
-        self.workflow = self._build_workflow()
+        # Reuse the shared LangGraph workflow (built on first use)
+        self.workflow = type(self)._get_workflow()
 
         logger.info("FM Station Planner initialized with LangGraph workflow")
 
-    def _build_workflow(self) -> StateGraph:
+    @classmethod
+    def _get_workflow(cls):
+        """Get the compiled workflow, building it on first call"""
+        if cls._workflow is None:
+            with cls._workflow_lock:
+                if cls._workflow is None:
+                    cls._workflow = cls._build_workflow()
+        return cls._workflow
+
+    @staticmethod
+    def _build_workflow() -> StateGraph:
         """Build the LangGraph workflow"""
+        from langgraph.graph import StateGraph, START, END
+        from langgraph.types import CachePolicy
+        from .agents import (
+            FMStationState,
+            language_processing_node,
+            location_processing_node,
+            database_query_node,
+            route_planning_node,
+            response_generation_node,
+            location_based_planning_node,
+            step_by_step_planning_node,
+            multi_day_planning_node,
+            detect_step_by_step_request,
+            should_continue_after_stations,
+            error_response_node
+        )
 
         # Create state graph
         workflow = StateGraph(FMStationState)
 
-        # Add nodes
-        workflow.add_node("language_processing", language_processing_node)
-        workflow.add_node("location_processing", location_processing_node)
-        workflow.add_node("database_query", database_query_node)
+        # Add nodes - parsing and geocoding give the same result for the same input, so
+        # repeated prompts reuse them (LLM and geocoder calls) for CACHE_TTL_SECONDS
+        workflow.add_node(
+            "language_processing", language_processing_node,
+            cache_policy=CachePolicy(key_func=lambda state: state["user_input"], ttl=Config.CACHE_TTL_SECONDS)
+        )
+        workflow.add_node(
+            "location_processing", location_processing_node,
+            cache_policy=CachePolicy(key_func=_requested_province, ttl=Config.CACHE_TTL_SECONDS)
+        )
+        workflow.add_node("database_query", _limit_concurrency(database_query_node, DATABASE_NODE_CONCURRENCY))
         workflow.add_node("route_planning", route_planning_node)
         workflow.add_node("response_generation", response_generation_node)
         workflow.add_node("location_based_planning", location_based_planning_node)
-        workflow.add_node("step_by_step_planning", step_by_step_planning_node)
-        workflow.add_node("multi_day_planning", multi_day_planning_node)
+        workflow.add_node(
+            "step_by_step_planning", _limit_concurrency(step_by_step_planning_node, DATABASE_NODE_CONCURRENCY)
+        )
+        workflow.add_node("multi_day_planning", _limit_concurrency(multi_day_planning_node, ROUTING_NODE_CONCURRENCY))
         workflow.add_node("error_response", error_response_node)
 
         # Add edges
-        workflow.add_edge(START, "language_processing")
+        # The request type depends only on the raw input and GPS location, so multi-day
+        # requests (which parse their own input) go straight to the planner without the
+        # LLM language-processing call
+        workflow.add_conditional_edges(
+            START,
+            detect_step_by_step_request,
+            {
+                "multi_day": "multi_day_planning",
+                "step_by_step": "language_processing",
+                "standard": "language_processing"
+            }
+        )
 
-        # Conditional edge after language processing to detect request type
+        # Conditional edge after language processing to detect request type. Multi-day
+        # requests were already routed from START and language processing leaves the
+        # input and location unchanged, so only step-by-step or standard remain
         workflow.add_conditional_edges(
             "language_processing",
             detect_step_by_step_request,
             {
-                "multi_day": "multi_day_planning",
                 "step_by_step": "step_by_step_planning",
                 "standard": "location_processing"
             }
@@ -92,8 +202,8 @@ class FMStationPlanner:
         workflow.add_edge("multi_day_planning", END)
         workflow.add_edge("error_response", END)
 
-        # Compile the workflow
-        return workflow.compile()
+        # Compile the workflow (station queries and routing stay uncached - availability changes)
+        return workflow.compile(cache=_success_only_cache())
 
     def plan_inspection(self,
                        user_input: str,
@@ -112,45 +222,59 @@ class FMStationPlanner:
         logger.info(f"Starting inspection planning for: {user_input}")
 
         try:
-            # Initialize state
-            initial_state: FMStationState = {
-                "user_input": user_input,
-                "requirements": {},
-                "location_coords": {},
-                "start_location": {},
-                "stations": [],
-                "route_info": {},
-                "stations_ordered": [],
-                "current_location": current_location,
-                "location_based_plan": {},
-                "plan_evaluation": {},
-                "final_response": "",
-                "errors": [],
-                # New step-by-step fields
-                "step_by_step_mode": False,
-                "visited_station_ids": [],
-                "current_step": 0,
-                "nearest_station": None
-            }
-
-            # Override start location if provided
-            if current_location:
-                initial_state["start_location"] = {
-                    "lat": current_location[0],
-                    "lon": current_location[1],
-                    "name": "Current Location"
-                }
-
             # Execute the workflow
-            result = self.workflow.invoke(initial_state)
+            result = self.workflow.invoke(self._initial_state(user_input, current_location))
 
             # Return the final response
-            return result.get("final_response", "Sorry, an error occurred during processing")
+            return result.get("final_response", NO_RESPONSE_MESSAGE)
 
         except Exception as e:
             logger.error(f"Error in LangGraph planning: {e}", exc_info=True)
             return f"Sorry, an error occurred during planning: {str(e)}"
 
+    def plan_inspection_batch(self,
+                              requests: List[Tuple[str, Optional[Tuple[float, float]]]]) -> List[str]:
+        """
+        Plan several inspections at once, running their workflows concurrently
+
+        Args:
+            requests: (user_input, current_location) per request
+
+        Returns:
+            Responses in request order (an error message for requests that failed)
+        """
+        logger.info(f"Starting batch inspection planning for {len(requests)} requests")
+
+        states = [self._initial_state(user_input, current_location) for user_input, current_location in requests]
+        results = self.workflow.batch(
+            states, config={"max_concurrency": self.BATCH_MAX_CONCURRENCY}, return_exceptions=True
+        )
+
+        responses = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error in LangGraph planning: {result}")
+                responses.append(f"Sorry, an error occurred during planning: {str(result)}")
+            else:
+                responses.append(result.get("final_response", NO_RESPONSE_MESSAGE))
+        return responses
+
+    @staticmethod
+    def _initial_state(user_input: str, current_location: Optional[Tuple[float, float]]) -> FMStationState:
+        """Build the workflow's starting state for one request"""
+        # Nodes fill in the remaining state fields as they run
+        initial_state: FMStationState = {"user_input": user_input, "current_location": current_location}
+
+        # Override start location if provided
+        if current_location:
+            initial_state["start_location"] = {
+                "lat": current_location[0],
+                "lon": current_location[1],
+                "name": "Current Location"
+            }
+
+        return initial_state
+
     def plan_inspection_with_location(self,
                                     user_input: str,
                                     start_location: Tuple[float, float]) -> str:
@@ -167,9 +291,15 @@ class FMStationPlanner:
         return self.plan_inspection(user_input, start_location)
 
     def get_workflow_visualization(self) -> bytes:
-        """Get a visual representation of the LangGraph workflow"""
+        """Get a visual representation of the LangGraph workflow (rendered once, then reused)"""
+        cls = type(self)
+        if cls._workflow_png is not None:
+            return cls._workflow_png
+
         try:
-            return self.workflow.get_graph().draw_mermaid_png()
+            # Rendering goes through the Mermaid web service; only a successful render is kept
+            cls._workflow_png = self.workflow.get_graph().draw_mermaid_png()
+            return cls._workflow_png
         except Exception as e:
             logger.error(f"Failed to generate workflow visualization: {e}")
             return None
@@ -178,17 +308,14 @@ class InteractivePlanner:
     """Interactive CLI for FM Station Planning"""
 
     def __init__(self):
+        from ..services.location_choice_service import LocationChoiceService
+
         self.planner = FMStationPlanner()
         self.location_service = LocationChoiceService()
 
     def run(self):
         """Run interactive planning session"""
-        print("=" * 60)
-        print("FM Station Inspection Planner")
-        print("=" * 60)
-        print("Welcome to the FM Station Inspection Planning System")
-        print("Type 'exit' or 'quit' to exit the program")
-        print("-" * 60)
+        print(WELCOME_BANNER)
 
         while True:
             try:
@@ -196,7 +323,7 @@ class InteractivePlanner:
                 user_input = input("\nPlease specify your requirements: ").strip()
 
                 # Check for exit commands
-                if user_input.lower() in ['exit', 'quit']:
+                if user_input.lower() in EXIT_COMMANDS:
                     print("\nThank you for using the service!")
                     break
 
@@ -213,15 +340,14 @@ class InteractivePlanner:
                     while current_location is None:
                         choice_input = input("\n📍 Your choice (1 or 2): ").strip()
 
-                        if choice_input.lower() in ['exit', 'quit']:
+                        if choice_input.lower() in EXIT_COMMANDS:
                             print("\n👋 Thank you for using the service!")
                             return
 
                         choice = self.location_service.parse_location_choice(choice_input)
 
                         if choice['type'] == 'request_location':
-                            print("\n📱 For console mode, I'll use NBTC23 base location instead.")
-                            print("(In a real bot, you would share your GPS location)")
+                            print(CONSOLE_LOCATION_NOTICE)
                             # Automatically use NBTC23 base for console mode
                             choice = self.location_service.parse_location_choice("2")
 
@@ -238,7 +364,7 @@ class InteractivePlanner:
                         location_detector = AutoLocationDetector()
                         current_location = location_detector.get_current_location()
                         if current_location:
-                            location_info = location_detector.get_location_info()
+                            location_info = location_detector.get_location_info(current_location)
                             print(f"✅ Auto-detected: {location_info}")
                     except ImportError:
                         pass
@@ -248,11 +374,7 @@ class InteractivePlanner:
                 response = self.planner.plan_inspection(user_input, current_location)
 
                 # Display response
-                print("\n" + "=" * 60)
-                print("Inspection Plan:")
-                print("-" * 60)
-                print(response)
-                print("=" * 60)
+                print(PLAN_RESPONSE_TEMPLATE.format(response=response))
 
             except KeyboardInterrupt:
                 print("\n\nThank you for using the service!")
@@ -1,5 +1,7 @@
 """Supabase database connector for FM stations"""
 
+import math
+import numpy as np
 from typing import List, Dict, Optional, Tuple
 from supabase import create_client, Client
 from ..config.config import Config
@@ -327,16 +329,58 @@ class StationDatabase:
                                      stations: List[Dict],
                                      reference_point: Tuple[float, float]) -> List[Dict]:
         """Add distance information to stations"""
+        from ..utils.geo_kernels import haversine_km_rad
+
+        # Convert the shared reference point to radians once, not per station
+        ref_lat = math.radians(reference_point[0])
+        ref_lon = math.radians(reference_point[1])
+
         for station in stations:
             if station.get("lat") and station.get("long"):
-                station_coords = (station["lat"], station["long"])
-                distance = haversine(reference_point, station_coords, unit=Unit.KILOMETERS)
+                distance = haversine_km_rad(ref_lat, ref_lon,
+                                            math.radians(station["lat"]), math.radians(station["long"]))
                 station["distance_km"] = round(distance, 2)
 
         # Sort by distance
         stations.sort(key=lambda x: x.get("distance_km", float('inf')))
         return stations
 
+    def get_nearest_stations(self,
+                             stations: List[Dict],
+                             reference_point: Tuple[float, float],
+                             count: int) -> List[Dict]:
+        """
+        Select the `count` stations closest to a reference point
+
+        Distances to every station are computed in one vectorized pass and ranked with a
+        stable argsort, so only the selected stations are copied. Input dicts are not
+        modified; the returned copies carry distance_km and are sorted by distance
+        (stations without GPS last, ties in input order).
+        """
+        from ..utils.geo_kernels import haversine_km_rad, haversine_to_point_km
+
+        if count <= 0 or not stations:
+            return []
+
+        ref_lat = math.radians(reference_point[0])
+        ref_lon = math.radians(reference_point[1])
+
+        located = np.array([bool(s.get("lat") and s.get("long")) for s in stations])
+        coords = np.array([(s["lat"], s["long"]) if has_gps else (0.0, 0.0)
+                           for s, has_gps in zip(stations, located)], dtype=np.float64)
+        coords = np.radians(coords)
+        distances = np.where(located, haversine_to_point_km(coords[:, 0], coords[:, 1], ref_lat, ref_lon), np.inf)
+
+        selected = []
+        for index in np.argsort(distances, kind='stable')[:count].tolist():
+            station = dict(stations[index])
+            if located[index]:
+                # Reported distance from the scalar kernel (same value as enrich_stations_with_distance)
+                station["distance_km"] = round(haversine_km_rad(ref_lat, ref_lon, coords[index, 0], coords[index, 1]), 2)
+            selected.append(station)
+
+        return selected
+
     def get_nearest_station(self,
                           current_location: Tuple[float, float],
                           exclude_station_ids: List[str] = None) -> Optional[Dict]:
@@ -13,8 +13,6 @@ import logging
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core.planner import FMStationPlanner, InteractivePlanner
-
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -37,7 +35,10 @@ def main():
     print("=" * 50)
 
     try:
-        # Start interactive planner
+        # Start interactive planner (imported here so the banner shows before the
+        # LangGraph/LLM stack loads)
+        from src.core.planner import InteractivePlanner
+
         interactive = InteractivePlanner()
         interactive.run()
     except KeyboardInterrupt:
@@ -1,6 +1,13 @@
 """External services for LLM and API integrations"""
 
-from .openrouter_client import OpenRouterClient
-from .plan_evaluator import PlanEvaluationAgent
+from ..utils.lazy import lazy_exports
 
-__all__ = ['OpenRouterClient', 'PlanEvaluationAgent']
\ No newline at end of file
+# Public name -> defining submodule, imported on first access (as in src/__init__.py)
+_EXPORTS = {
+    'OpenRouterClient': '.openrouter_client',
+    'PlanEvaluationAgent': '.plan_evaluator'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
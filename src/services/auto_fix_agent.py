@@ -8,6 +8,30 @@ from typing import Dict, List, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Request rewrites for fixes, compiled once. Each pattern finds a count with its optional
+# lead-in word and unit in one pass, and the rewrite functions below decide what to replace
+DAY_COUNT_PATTERN = re.compile(r'(?:(?P<prefix>in|for)\s*)?(?P<count>\d+)(?P<unit>\s*days?)?')
+STATION_COUNT_PATTERN = re.compile(r'(?:(?P<prefix>find|plan|give\s*me)\s*)?(?P<count>\d+)(?P<unit>\s*stations?)?')
+
+
+def _rewrite_day_count(match: re.Match, new_days: int) -> str:
+    """Day counts ("2 days", "in 2day") become "<new_days> day", keeping an "in"/"for" lead-in"""
+    if not match.group('unit'):
+        return match.group(0)
+    prefix = match.group('prefix')
+    return f"{prefix} {new_days} day" if prefix else f"{new_days} day"
+
+
+def _rewrite_station_count(match: re.Match, target_stations: int) -> str:
+    """Station counts ("20 stations", "find 20") become target_stations, keeping the lead-in"""
+    prefix, unit = match.group('prefix'), match.group('unit')
+    if not prefix and not unit:
+        return match.group(0)
+    count = f"{target_stations} stations" if unit else str(target_stations)
+    if not prefix:
+        return count
+    return f"{'give me' if prefix.startswith('give') else prefix} {count}"
+
 class AutoFixAgent:
     """Agent that automatically fixes problematic plans"""
 
@@ -72,29 +96,15 @@ class AutoFixAgent:
             new_days = fix_strategy.get("new_days", 3)
 
             # Replace day count patterns
-            patterns = [
-                (r'(\d+)\s*days?', f'{new_days} day'),
-                (r'in\s*(\d+)\s*day', f'in {new_days} day'),
-                (r'for\s*(\d+)\s*day', f'for {new_days} day'),
-                (r'(\d+)day', f'{new_days}day')
-            ]
-
-            for pattern, replacement in patterns:
-                new_request = re.sub(pattern, replacement, new_request)
+            new_request = DAY_COUNT_PATTERN.sub(lambda match: _rewrite_day_count(match, new_days), new_request)
 
         elif primary_action == "reduce_stations":
             target_stations = fix_strategy.get("target_stations", 15)
 
             # Replace station count patterns
-            patterns = [
-                (r'(\d+)\s*stations?', f'{target_stations} stations'),
-                (r'find\s*(\d+)', f'find {target_stations}'),
-                (r'plan\s*(\d+)', f'plan {target_stations}'),
-                (r'give\s*me\s*(\d+)', f'give me {target_stations}')
-            ]
-
-            for pattern, replacement in patterns:
-                new_request = re.sub(pattern, replacement, new_request)
+            new_request = STATION_COUNT_PATTERN.sub(
+                lambda match: _rewrite_station_count(match, target_stations), new_request
+            )
 
         elif primary_action == "single_province":
             # Focus on one province - prefer the first mentioned
@@ -3,15 +3,22 @@ District Worth Agent - Calculates which districts are worth visiting based on st
 """
 
 import logging
+import threading
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
-from haversine import haversine, Unit
+from ..utils.geo_kernels import mean_pairwise_distance_km
 
 logger = logging.getLogger(__name__)
 
 class DistrictWorthAgent:
     """Agent that calculates the worth/value of visiting different districts"""
 
+    # (district, station count, coordinates, threshold) -> analysis, oldest first. Shared
+    # by all agents: the graph builds a new planner (and agent) for every request
+    WORTH_CACHE_SIZE = 1024
+    _worth_cache: Dict[tuple, Dict] = {}
+    _worth_cache_lock = threading.Lock()
+
     def __init__(self):
         self.min_stations_threshold = 2  # Minimum stations to be worth visiting
         self.max_distance_threshold = 50  # Max km radius for district compactness
@@ -48,6 +55,14 @@ class DistrictWorthAgent:
             if lat and lon and lat != 0 and lon != 0:
                 valid_coords.append((float(lat), float(lon)))
 
+        # The analysis depends only on the name, station count, coordinates and visit
+        # threshold, so a district seen on an earlier request is answered from memory
+        key = (district_name, station_count, tuple(valid_coords), self.min_stations_threshold)
+        with self._worth_cache_lock:
+            cached = self._worth_cache.get(key)
+        if cached is not None:
+            return dict(cached, coordinates=list(cached["coordinates"]))
+
         if len(valid_coords) < 2:
             density_score = 50  # Default for single station
             compactness_score = 50
@@ -76,7 +91,7 @@ class DistrictWorthAgent:
         else:
             reason = f"Good target: {station_count} stations, score {worth_score:.1f}"
 
-        return {
+        analysis = {
             "district": district_name,
             "worth_score": round(worth_score, 1),
             "station_count": station_count,
@@ -87,6 +102,12 @@ class DistrictWorthAgent:
             "coordinates": valid_coords
         }
 
+        with self._worth_cache_lock:
+            if key not in self._worth_cache and len(self._worth_cache) >= self.WORTH_CACHE_SIZE:
+                self._worth_cache.pop(next(iter(self._worth_cache)))
+            self._worth_cache[key] = analysis
+        return dict(analysis, coordinates=list(valid_coords))
+
     def _calculate_density_score(self, coordinates: List[Tuple[float, float]]) -> float:
         """Calculate density score based on stations per area (0-30 points)"""
         if len(coordinates) < 2:
@@ -122,20 +143,8 @@ class DistrictWorthAgent:
         if len(coordinates) < 2:
             return 15  # Default score for single station
 
-        # Calculate average distance between all pairs
-        total_distance = 0
-        pair_count = 0
-
-        for i in range(len(coordinates)):
-            for j in range(i + 1, len(coordinates)):
-                distance = haversine(coordinates[i], coordinates[j], unit=Unit.KILOMETERS)
-                total_distance += distance
-                pair_count += 1
-
-        if pair_count == 0:
-            return 15
-
-        avg_distance = total_distance / pair_count
+        # Average distance between all pairs
+        avg_distance = mean_pairwise_distance_km(coordinates)
 
         # Score: closer stations = better score (0-30)
         if avg_distance < 5:
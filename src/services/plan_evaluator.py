@@ -288,16 +288,20 @@ Keep response concise and practical for field work."""
         if len(stations) < 2:
             return self._calculate_total_distance(stations, start_location)
 
-        # Simple nearest neighbor estimation
-        unvisited = stations.copy()
+        # Simple nearest neighbor estimation (visited flags instead of list.remove on dicts)
+        visited = [False] * len(stations)
+        remaining_count = len(stations)
         current_pos = start_location
         total_distance = 0.0
 
-        while unvisited:
-            nearest_station = None
+        while remaining_count:
+            nearest_idx = None
             min_distance = float('inf')
 
-            for station in unvisited:
+            for idx, station in enumerate(stations):
+                if visited[idx]:
+                    continue
+
                 # Try different coordinate field names
                 lat = station.get("latitude") or station.get("lat")
                 lon = station.get("longitude") or station.get("long") or station.get("lon")
@@ -310,11 +314,13 @@ Keep response concise and practical for field work."""
 
                 if distance < min_distance:
                     min_distance = distance
-                    nearest_station = station
+                    nearest_idx = idx
 
-            if nearest_station:
+            if nearest_idx is not None:
+                nearest_station = stations[nearest_idx]
                 total_distance += min_distance
-                unvisited.remove(nearest_station)
+                visited[nearest_idx] = True
+                remaining_count -= 1
 
                 # Update position if coordinates are available
                 lat = nearest_station.get("latitude") or nearest_station.get("lat")
@@ -4,9 +4,12 @@ Travel Time Service using free routing APIs for accurate travel time calculation
 
 import requests
 import logging
+import threading
 import time
 import os
-from typing import Tuple, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Tuple, Dict, Any, Optional, List
 from haversine import haversine, Unit
 
 class DistanceCache:
@@ -51,7 +54,12 @@ class DistanceCache:
         return self.district_to_home_cache.get(key)
 
     def get_same_district_travel_info(self) -> Dict[str, Any]:
-        """Return standard travel info for same district stations"""
+        """Return standard travel info for same district stations (shared, do not mutate)"""
+        return self.same_district_travel_info
+
+    @cached_property
+    def same_district_travel_info(self) -> Dict[str, Any]:
+        """Same-district travel info, built once on first use"""
         return {
             'duration_seconds': self.same_district_time * 60,
             'duration_minutes': self.same_district_time,
@@ -62,6 +70,12 @@ class DistanceCache:
 
 logger = logging.getLogger(__name__)
 
+# ORS requests in flight at once across the whole process. Day planning threads,
+# their prefetch pools and concurrent graph nodes all share this budget, so the
+# free-tier limit holds however many of them run
+ORS_MAX_CONCURRENT_REQUESTS = 4
+_ors_request_slots = threading.BoundedSemaphore(ORS_MAX_CONCURRENT_REQUESTS)
+
 class TravelTimeService:
     """Service for accurate travel time calculations using real routing APIs"""
 
@@ -72,6 +86,8 @@ class TravelTimeService:
         # OpenRouteService configuration
         self.ors_api_key = os.getenv("OPENROUTESERVICE_API_KEY")
         self.ors_base_url = "https://api.openrouteservice.org/v2/directions/driving-car"
+        self.ors_matrix_url = "https://api.openrouteservice.org/v2/matrix/driving-car"
+        self.ors_matrix_max_locations = 50  # Keep requests well inside the free-tier matrix limit
 
         # Initialize distance cache
         self.cache = DistanceCache()
@@ -91,6 +107,15 @@ class TravelTimeService:
         # Fallback to simple distance calculation
         self.fallback_speed_kmh = 45  # More realistic average speed
 
+        # Routed results by coordinates rounded to 5 decimals (~1 m), oldest evicted first
+        # Day routes and bulk lookups fill it from several threads at once
+        self.travel_time_cache = {}
+        self.travel_time_cache_size = 4096
+        self.travel_time_cache_lock = threading.Lock()
+        # After an ORS failure, skip it for a while instead of retrying on every call
+        self.ors_failure_backoff = 10  # seconds
+        self.ors_retry_after = 0.0
+
     def get_travel_time_osrm(self,
                             origin: Tuple[float, float],
                             destination: Tuple[float, float]) -> Optional[Dict[str, Any]]:
@@ -196,7 +221,8 @@ class TravelTimeService:
                     'format': 'json'
                 }
 
-                response = requests.post(self.ors_base_url, json=data, headers=headers, timeout=self.timeout)
+                with _ors_request_slots:
+                    response = requests.post(self.ors_base_url, json=data, headers=headers, timeout=self.timeout)
                 response.raise_for_status()
 
                 result = response.json()
@@ -252,6 +278,87 @@ class TravelTimeService:
 
         return None
 
+    def get_travel_time_matrix(self, points: List[Tuple[float, float]]) -> Optional[List[List[Dict[str, Any]]]]:
+        """
+        Get travel info between every pair of points with one OpenRouteService matrix request
+
+        Args:
+            points: List of (lat, lon) tuples
+
+        Returns:
+            matrix[i][j] travel info from points[i] to points[j] (same shape as
+            get_travel_time results), or None if the matrix API is unavailable
+        """
+        if not self.ors_api_key or len(points) < 2 or len(points) > self.ors_matrix_max_locations:
+            return None
+
+        # ORS failed recently (likely rate limited) - let callers fall back without a request
+        if time.monotonic() < self.ors_retry_after:
+            return None
+
+        headers = {
+            'Authorization': self.ors_api_key,
+            'Content-Type': 'application/json'
+        }
+        data = {
+            'locations': [[lon, lat] for lat, lon in points],  # ORS expects [lon, lat]
+            'metrics': ['duration', 'distance'],
+            'units': 'm'
+        }
+
+        for attempt in range(self.max_retries):
+            try:
+                logger.debug(f"ORS matrix API attempt {attempt + 1}/{self.max_retries} for {len(points)} points")
+
+                with _ors_request_slots:
+                    response = requests.post(self.ors_matrix_url, json=data, headers=headers, timeout=self.timeout)
+                response.raise_for_status()
+
+                result = response.json()
+                durations = result.get('durations')
+                distances = result.get('distances')
+                if not durations or not distances:
+                    logger.warning("ORS matrix failed: No durations/distances returned")
+                    return None
+
+                matrix = []
+                for i, origin in enumerate(points):
+                    row = []
+                    for j, destination in enumerate(points):
+                        duration = durations[i][j]
+                        distance = distances[i][j]
+                        if duration is None or distance is None:
+                            # Unroutable pair - estimate it like a single failed lookup
+                            row.append(self.get_travel_time_fallback(origin, destination))
+                        else:
+                            row.append({
+                                'duration_seconds': duration,
+                                'duration_minutes': round(duration / 60, 1),
+                                'distance_meters': distance,
+                                'distance_km': round(distance / 1000, 2),
+                                'source': 'openrouteservice_matrix'
+                            })
+                    matrix.append(row)
+
+                logger.debug(f"ORS matrix API successful on attempt {attempt + 1}")
+                return matrix
+
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"ORS matrix API request failed on attempt {attempt + 1}: {e}")
+                if attempt < self.max_retries - 1:
+                    time.sleep(self.retry_delay)
+                    continue
+                else:
+                    logger.error(f"ORS matrix API failed after {self.max_retries} attempts")
+                    self.ors_retry_after = time.monotonic() + self.ors_failure_backoff
+                    return None
+
+            except Exception as e:
+                logger.error(f"Unexpected error calling ORS matrix API: {e}")
+                return None
+
+        return None
+
     def get_travel_time_fallback(self,
                                origin: Tuple[float, float],
                                destination: Tuple[float, float]) -> Dict[str, Any]:
@@ -315,19 +422,51 @@ class TravelTimeService:
             logger.debug(f"Skipping API calls, using fallback distance calculation")
             return self.get_travel_time_fallback(origin, destination)
 
+        # Pairs already routed by the API are answered from memory
+        key = (round(origin[0], 5), round(origin[1], 5), round(destination[0], 5), round(destination[1], 5))
+        with self.travel_time_cache_lock:
+            cached = self.travel_time_cache.get(key)
+        if cached is not None:
+            return cached
+
         # Try OpenRouteService but fallback quickly on rate limits
-        if self.ors_api_key:
+        if self.ors_api_key and time.monotonic() >= self.ors_retry_after:
             result = self.get_travel_time_ors(origin, destination)
             if result is not None:
                 logger.debug(f"Using OpenRouteService for travel time calculation")
+                with self.travel_time_cache_lock:
+                    if key not in self.travel_time_cache and \
+                            len(self.travel_time_cache) >= self.travel_time_cache_size:
+                        self.travel_time_cache.pop(next(iter(self.travel_time_cache)))
+                    self.travel_time_cache[key] = result
                 return result
             else:
+                self.ors_retry_after = time.monotonic() + self.ors_failure_backoff
                 logger.debug(f"OpenRouteService unavailable (likely rate limited), using fallback calculation")
 
         # Skip OSRM due to timeout issues - go straight to fallback
         logger.debug(f"Using fallback distance calculation")
         return self.get_travel_time_fallback(origin, destination)
 
+    def get_travel_times_bulk(self,
+                              pairs: List[Tuple[Tuple[float, float], Tuple[float, float]]],
+                              max_workers: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get travel times for many (origin, destination) pairs concurrently
+
+        Args:
+            pairs: List of ((lat, lon), (lat, lon)) tuples
+            max_workers: Maximum concurrent routing requests
+
+        Returns:
+            Travel info per pair, in input order
+        """
+        if len(pairs) < 2 or max_workers <= 1:
+            return [self.get_travel_time(origin, destination) for origin, destination in pairs]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as executor:
+            return list(executor.map(lambda pair: self.get_travel_time(*pair), pairs))
+
     def get_same_district_travel_time(self) -> Dict[str, Any]:
         """Return minimal travel time for same district stations"""
         return self.cache.get_same_district_travel_info()
@@ -434,7 +573,7 @@ class TravelTimeService:
 
         for i, destination in enumerate(destinations):
             try:
-                travel_info = self.get_travel_time(origin, destination)
+                travel_info = dict(self.get_travel_time(origin, destination))  # Cached results are shared
                 travel_info['destination_index'] = i
                 results.append(travel_info)
             except Exception as e:
@@ -1,7 +1,14 @@
 """Utility modules for location and mapping"""
 
-from .location_tool import LocationTool
-from .location_province_mapper import ThaiProvinceMapper
-from .auto_location import AutoLocationDetector
+from .lazy import lazy_exports
 
-__all__ = ['LocationTool', 'ThaiProvinceMapper', 'AutoLocationDetector']
\ No newline at end of file
+# Public name -> defining submodule, imported on first access (as in src/__init__.py)
+_EXPORTS = {
+    'LocationTool': '.location_tool',
+    'ThaiProvinceMapper': '.location_province_mapper',
+    'AutoLocationDetector': '.auto_location'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -196,9 +196,10 @@ else:
         logger.info(f"Using precise fallback location: {precise_location}")
         return precise_location
 
-    def get_location_info(self) -> str:
-        """Get location information as a readable string"""
-        location = self.get_current_location()
+    def get_location_info(self, location: Optional[Tuple[float, float]] = None) -> str:
+        """Get location information as a readable string (detects the location if not given)"""
+        if location is None:
+            location = self.get_current_location()
 
         if location:
             lat, lon = location
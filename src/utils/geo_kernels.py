@@ -0,0 +1,390 @@
+"""Numeric geo helpers for route planning (nearest-neighbor lookups, distances)"""
+
+import math
+from itertools import permutations
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, vectorize
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+EARTH_RADIUS_KM = 6371.0088  # Mean earth radius, same value the haversine package uses
+BRUTE_FORCE_MAX_STOPS = 5      # Tours up to this many stops are solved exactly
+TOUR_IMPROVEMENT_EPS_KM = 1e-6  # Ignore float noise when comparing tour lengths
+OR_OPT_MAX_SEGMENT = 3          # Longest run of stops Or-opt tries to relocate
+SCALAR_MATRIX_MAX_STATIONS = 4  # Below this, plain math beats NumPy dispatch overhead
+
+
+def haversine_km_rad(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km between two points already given in radians"""
+    sin_dlat = math.sin((lat2 - lat1) * 0.5)
+    sin_dlon = math.sin((lon2 - lon1) * 0.5)
+    d = sin_dlat * sin_dlat + math.cos(lat1) * math.cos(lat2) * sin_dlon * sin_dlon
+    return 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(d))
+
+
+def haversine_matrix_km(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Pairwise great-circle distances in km between points given in radians"""
+    sin_dlat = np.sin((lats[np.newaxis, :] - lats[:, np.newaxis]) * 0.5)
+    sin_dlon = np.sin((lons[np.newaxis, :] - lons[:, np.newaxis]) * 0.5)
+    cos_lat = np.cos(lats)
+    d = sin_dlat * sin_dlat + np.outer(cos_lat, cos_lat) * sin_dlon * sin_dlon
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(d))
+
+
+def haversine_to_point_km(lats: np.ndarray, lons: np.ndarray, lat: float, lon: float) -> np.ndarray:
+    """Great-circle distances in km from every point to one point (all in radians)"""
+    sin_dlat = np.sin((lats - lat) * 0.5)
+    sin_dlon = np.sin((lons - lon) * 0.5)
+    d = sin_dlat * sin_dlat + np.cos(lats) * math.cos(lat) * sin_dlon * sin_dlon
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(d))
+
+
+def within_bounding_box(coordinates: Sequence[Tuple[float, float]], center: Tuple[float, float],
+                        radius_km: float) -> np.ndarray:
+    """
+    Mask of points inside the lat/lon box that encloses a circle around center
+
+    A cheap prefilter for radius queries: every point within radius_km of the center
+    passes, plus some in the box corners, so callers still measure the survivors.
+
+    Args:
+        coordinates: (lat, lon) per point in degrees
+        center: (lat, lon) of the circle center in degrees
+        radius_km: Circle radius in km
+
+    Returns:
+        Boolean array, True for points inside the box
+    """
+    points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    lat_half = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Widen the longitude span at the box edge nearest the pole, where degrees are shortest
+    edge_lat = min(abs(center[0]) + lat_half, 89.0)
+    lon_half = lat_half / math.cos(math.radians(edge_lat))
+    return ((np.abs(points[:, 0] - center[0]) <= lat_half) &
+            (np.abs(points[:, 1] - center[1]) <= lon_half))
+
+
+def scalar_distance_matrix(lats: Sequence[float], lons: Sequence[float]) -> np.ndarray:
+    """Pairwise distances in km for a handful of points (radians) using scalar math"""
+    sin, cos, asin, sqrt = math.sin, math.cos, math.asin, math.sqrt
+    diameter = 2.0 * EARTH_RADIUS_KM
+    n = len(lats)
+    cos_lats = [cos(lat) for lat in lats]
+    distances = [[0.0] * n for _ in range(n)]
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            sin_dlat = sin((lats[j] - lats[i]) * 0.5)
+            sin_dlon = sin((lons[j] - lons[i]) * 0.5)
+            d = sin_dlat * sin_dlat + cos_lats[i] * cos_lats[j] * sin_dlon * sin_dlon
+            distances[i][j] = distances[j][i] = diameter * asin(sqrt(d))
+
+    return np.array(distances, dtype=np.float32)
+
+
+def mean_pairwise_distance_km(coordinates: Sequence[Tuple[float, float]]) -> float:
+    """
+    Average great-circle distance in km over every pair of points
+
+    Args:
+        coordinates: (lat, lon) per point in degrees, at least two points
+
+    Returns:
+        Mean of the n * (n - 1) / 2 pairwise distances
+    """
+    n = len(coordinates)
+    points = np.radians(np.asarray(coordinates, dtype=np.float64))
+
+    if n <= SCALAR_MATRIX_MAX_STATIONS:
+        lats, lons = points[:, 0].tolist(), points[:, 1].tolist()
+        total = sum(haversine_km_rad(lats[i], lons[i], lats[j], lons[j])
+                    for i in range(n) for j in range(i + 1, n))
+        return total / (n * (n - 1) // 2)
+
+    if NUMBA_AVAILABLE:
+        return float(_mean_pairwise_km(np.ascontiguousarray(points[:, 0]),
+                                       np.ascontiguousarray(points[:, 1])))
+
+    distances = haversine_matrix_km(points[:, 0], points[:, 1])
+    return float(distances[np.triu_indices(n, 1)].mean())
+
+
+def group_means(values: np.ndarray, group_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Column means of values per group in one vectorized pass
+
+    Args:
+        values: (n, k) array
+        group_ids: (n,) integer group id per row
+
+    Returns:
+        (unique group ids, (groups, k) array of means)
+    """
+    order = np.argsort(group_ids, kind='stable')
+    groups, starts, counts = np.unique(group_ids[order], return_index=True, return_counts=True)
+    sums = np.add.reduceat(values[order], starts, axis=0)
+    return groups, sums / counts[:, np.newaxis]
+
+
+def sweep_partition(coordinates: Sequence[Tuple[float, float]], origin: Tuple[float, float],
+                    sizes: Sequence[int]) -> List[List[int]]:
+    """
+    Split points into consecutive angular sectors around the origin
+
+    Points are ordered by bearing from the origin, starting after the widest empty
+    angle so no sector straddles it, and cut into groups of the requested sizes.
+
+    Args:
+        coordinates: (lat, lon) per point in degrees
+        origin: (lat, lon) of the sweep center in degrees
+        sizes: Number of points per group (must sum to len(coordinates))
+
+    Returns:
+        Point indices per group, each in ascending index order
+    """
+    points = np.radians(np.asarray(coordinates, dtype=np.float64).reshape(-1, 2))
+    origin_lat, origin_lon = np.radians(origin)
+    angles = np.arctan2(points[:, 0] - origin_lat, (points[:, 1] - origin_lon) * np.cos(origin_lat))
+    order = np.argsort(angles, kind='stable')
+
+    if len(order) > 1:
+        sorted_angles = angles[order]
+        gaps = np.diff(np.append(sorted_angles, sorted_angles[0] + 2.0 * np.pi))
+        order = np.roll(order, -((int(np.argmax(gaps)) + 1) % len(order)))
+
+    return [sorted(group.tolist()) for group in np.split(order, np.cumsum(sizes)[:-1])]
+
+
+def _mean_pairwise_km(lats, lons):
+    """Mean haversine distance in km over all pairs of points (radians), no matrix"""
+    n = lats.shape[0]
+    cos_lats = np.cos(lats)
+    total = 0.0
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            sin_dlat = math.sin((lats[j] - lats[i]) * 0.5)
+            sin_dlon = math.sin((lons[j] - lons[i]) * 0.5)
+            d = sin_dlat * sin_dlat + cos_lats[i] * cos_lats[j] * sin_dlon * sin_dlon
+            total += math.asin(math.sqrt(d))
+
+    return 2.0 * EARTH_RADIUS_KM * total / (n * (n - 1) // 2)
+
+
+def _argmin_unvisited(row, visited):
+    """Index of the smallest entry in row that is not visited (-1 if none)"""
+    best_idx = -1
+    best_d = np.inf
+
+    for i in range(row.shape[0]):
+        if not visited[i] and row[i] < best_d:
+            best_d = row[i]
+            best_idx = i
+
+    return best_idx
+
+
+def _two_opt(tour, cost, eps):
+    """Reverse tour segments in place while that shortens the tour (endpoints fixed)"""
+    n = len(tour)
+    improved = True
+
+    while improved:
+        improved = False
+        for i in range(1, n - 2):
+            for j in range(i + 1, n - 1):
+                a = tour[i - 1]
+                b = tour[i]
+                c = tour[j]
+                d = tour[j + 1]
+                if cost[a, c] + cost[b, d] < cost[a, b] + cost[c, d] - eps:
+                    lo = i
+                    hi = j
+                    while lo < hi:
+                        tour[lo], tour[hi] = tour[hi], tour[lo]
+                        lo += 1
+                        hi -= 1
+                    improved = True
+
+    return tour
+
+
+def _or_opt(tour, cost, eps, max_segment):
+    """
+    Relocate runs of up to max_segment stops to a cheaper gap in place (endpoints fixed)
+
+    Returns True if the tour was changed. Complements 2-opt, which cannot move a stop
+    without reversing everything between its old and new position.
+    """
+    n = len(tour)
+    changed = False
+    improved = True
+
+    while improved:
+        improved = False
+        for seg_len in range(1, max_segment + 1):
+            for i in range(1, n - seg_len):
+                j = i + seg_len - 1
+                a = tour[i - 1]
+                s0 = tour[i]
+                s1 = tour[j]
+                b = tour[j + 1]
+                removal_gain = cost[a, s0] + cost[s1, b] - cost[a, b]
+
+                for k in range(n - 1):
+                    if i - 1 <= k <= j:
+                        continue
+                    p = tour[k]
+                    q = tour[k + 1]
+                    if cost[p, s0] + cost[s1, q] - cost[p, q] < removal_gain - eps:
+                        segment = tour[i:j + 1].copy()
+                        if k > j:
+                            # Shift the stops between the segment and the gap back, then drop it in
+                            tour[i:i + k - j] = tour[j + 1:k + 1].copy()
+                            tour[k - seg_len + 1:k + 1] = segment
+                        else:
+                            tour[k + 1 + seg_len:j + 1] = tour[k + 1:i].copy()
+                            tour[k + 1:k + 1 + seg_len] = segment
+                        improved = True
+                        changed = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+
+    return changed
+
+
+if NUMBA_AVAILABLE:
+    # nogil: day routes are planned on worker threads, so compiled kernels of
+    # different days run on separate cores instead of serializing on the GIL
+    _argmin_unvisited = njit(cache=True, fastmath=True, nogil=True)(_argmin_unvisited)
+    _mean_pairwise_km = njit(cache=True, nogil=True)(_mean_pairwise_km)
+    _two_opt = njit(cache=True, nogil=True)(_two_opt)
+    _or_opt = njit(cache=True, nogil=True)(_or_opt)
+
+    # float32 broadcasting ufunc for the distance matrix; fastmath lets LLVM use
+    # SIMD trig lanes. target='cpu' because days already run on threads and the
+    # 'parallel' target's default threading layer is not safe for concurrent calls
+    _haversine_km_f32 = vectorize(
+        ['float32(float32, float32, float32, float32)'], cache=True, fastmath=True
+    )(haversine_km_rad)
+
+
+def tour_length(rows: Sequence[int], cost: np.ndarray) -> float:
+    """Length of the closed tour origin (row 0) -> rows -> origin"""
+    length = 0.0
+    previous = 0
+    for row in rows:
+        length += cost[previous, row]
+        previous = row
+    return float(length + cost[previous, 0])
+
+
+def optimize_tour(rows: Sequence[int], cost: np.ndarray) -> List[int]:
+    """
+    Shorten a closed tour that starts and ends at the origin (row 0)
+
+    Tours of up to BRUTE_FORCE_MAX_STOPS stops are solved exactly by trying every
+    permutation; longer ones alternate 2-opt and Or-opt from the given order until
+    neither shortens the tour.
+
+    Args:
+        rows: Matrix rows of the stops in their current visiting order
+        cost: Square cost matrix including the origin at row/column 0
+
+    Returns:
+        Rows in the improved visiting order (the input order if nothing is shorter)
+    """
+    rows = list(rows)
+    if len(rows) < 2:
+        return rows
+
+    if len(rows) <= BRUTE_FORCE_MAX_STOPS:
+        best_rows = rows
+        best_length = tour_length(rows, cost)
+        for candidate in permutations(rows):
+            length = tour_length(candidate, cost)
+            if length < best_length - TOUR_IMPROVEMENT_EPS_KM:
+                best_rows = list(candidate)
+                best_length = length
+        return best_rows
+
+    tour = np.array([0] + rows + [0], dtype=np.int64)
+    cost = np.ascontiguousarray(cost, dtype=np.float64)
+    _two_opt(tour, cost, TOUR_IMPROVEMENT_EPS_KM)
+    while _or_opt(tour, cost, TOUR_IMPROVEMENT_EPS_KM, OR_OPT_MAX_SEGMENT):
+        _two_opt(tour, cost, TOUR_IMPROVEMENT_EPS_KM)
+    return tour[1:-1].tolist()
+
+
+class NearestStationIndex:
+    """
+    Nearest-unvisited station lookup over a precomputed distance matrix
+
+    Row/column 0 is the route origin and station i is row/column i + 1. The matrix
+    is computed once with a broadcast haversine and stored as float32 (it is only
+    used to rank candidates), so every greedy step is a row scan instead of trig.
+    The distance reported for the chosen station is recomputed in full precision.
+    """
+
+    def __init__(self, coordinates: List[Tuple[float, float]], origin: Tuple[float, float]):
+        self.size = len(coordinates)
+        self.visited = np.zeros(self.size, dtype=bool)
+        self.active_count = self.size
+
+        points = np.radians(np.asarray([origin] + list(coordinates), dtype=np.float64))
+        self.lats = np.ascontiguousarray(points[:, 0])
+        self.lons = np.ascontiguousarray(points[:, 1])
+
+        if self.size <= SCALAR_MATRIX_MAX_STATIONS:
+            self.distances = scalar_distance_matrix(self.lats.tolist(), self.lons.tolist())
+        elif NUMBA_AVAILABLE:
+            lats = self.lats.astype(np.float32)
+            lons = self.lons.astype(np.float32)
+            self.distances = _haversine_km_f32(lats[:, np.newaxis], lons[:, np.newaxis],
+                                               lats[np.newaxis, :], lons[np.newaxis, :])
+        else:
+            self.distances = haversine_matrix_km(self.lats, self.lons).astype(np.float32)
+
+    def distance(self, from_position: Optional[int], to_position: int) -> float:
+        """Full precision distance in km between two stations (None = origin)"""
+        from_row = 0 if from_position is None else from_position + 1
+        to_row = to_position + 1
+        return haversine_km_rad(self.lats[from_row], self.lons[from_row],
+                                self.lats[to_row], self.lons[to_row])
+
+    def mark_visited(self, idx: int):
+        """Exclude a station from future nearest queries"""
+        if not self.visited[idx]:
+            self.visited[idx] = True
+            self.active_count -= 1
+
+    def nearest(self, position: Optional[int] = None) -> Tuple[Optional[int], float]:
+        """
+        Find the nearest unvisited station to a station, or to the origin
+
+        Args:
+            position: Index of the current station, None for the origin
+
+        Returns:
+            (index, distance_km), or (None, inf) when every station is visited
+        """
+        if self.active_count <= 0:
+            return None, float('inf')
+
+        row = 0 if position is None else position + 1
+        candidates = self.distances[row, 1:]
+
+        if NUMBA_AVAILABLE:
+            idx = int(_argmin_unvisited(candidates, self.visited))
+        else:
+            idx = int(np.argmin(np.where(self.visited, np.inf, candidates)))
+
+        return idx, self.distance(position, idx)
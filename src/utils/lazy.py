@@ -0,0 +1,29 @@
+"""Lazy package exports: public names are imported from their submodule on first access"""
+
+import sys
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build the module-level __getattr__ and __dir__ (PEP 562) for a package
+
+    Args:
+        package: The package's __name__
+        exports: Public name -> defining submodule, relative to the package
+
+    Returns:
+        (__getattr__, __dir__) to assign in the package __init__
+    """
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(exports[name], package), name)
+        setattr(sys.modules[package], name, value)  # Later lookups skip __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+"""Test the route-planning geo kernels (tours, nearest lookups, day sectors) and their numba/NumPy paths"""
+
+import sys
+import os
+import math
+import random
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import geo_kernels
+from src.utils.geo_kernels import (
+    BRUTE_FORCE_MAX_STOPS, TOUR_IMPROVEMENT_EPS_KM, NearestStationIndex, haversine_km_rad,
+    haversine_matrix_km, optimize_tour, sweep_partition, tour_length
+)
+
+HOME = (14.78524443450366, 102.04253370526135)
+
+requires_numba = pytest.mark.skipif(not geo_kernels.NUMBA_AVAILABLE, reason="numba is not installed")
+
+
+def random_points(n, seed, spread=1.0):
+    """n (lat, lon) points scattered around home"""
+    rnd = random.Random(seed)
+    return [(HOME[0] + rnd.uniform(-spread, spread), HOME[1] + rnd.uniform(-spread, spread)) for _ in range(n)]
+
+
+def cost_matrix(points):
+    """Distance matrix with home at row/column 0, like the day planner builds"""
+    radians = np.radians(np.asarray([HOME] + points, dtype=np.float64))
+    return haversine_matrix_km(radians[:, 0], radians[:, 1])
+
+
+def optimal_length(rows, cost):
+    """Shortest closed tour over rows by trying every order"""
+    return min(tour_length(candidate, cost) for candidate in permutations(rows))
+
+
+def test_optimize_tour_never_longer():
+    """The optimized tour visits the same stops and is never longer than the input order"""
+    for seed in range(60):
+        n = 2 + seed % 25
+        cost = cost_matrix(random_points(n, seed))
+        rows = list(range(1, n + 1))
+        random.Random(seed).shuffle(rows)
+
+        result = optimize_tour(rows, cost)
+
+        assert sorted(result) == sorted(rows)
+        assert tour_length(result, cost) <= tour_length(rows, cost) + TOUR_IMPROVEMENT_EPS_KM
+
+
+def test_optimize_tour_small_tours():
+    """Small tours: exact up to BRUTE_FORCE_MAX_STOPS, never below the optimum up to 7 stops"""
+    for seed in range(40):
+        n = 2 + seed % 6
+        cost = cost_matrix(random_points(n, seed))
+        rows = list(range(1, n + 1))
+
+        length = tour_length(optimize_tour(rows, cost), cost)
+        best = optimal_length(rows, cost)
+
+        assert length >= best - TOUR_IMPROVEMENT_EPS_KM
+        if n <= BRUTE_FORCE_MAX_STOPS:
+            assert length == pytest.approx(best, abs=TOUR_IMPROVEMENT_EPS_KM)
+
+
+def test_optimize_tour_trivial():
+    """Empty and single-stop tours come back unchanged"""
+    cost = cost_matrix(random_points(1, 0))
+    assert optimize_tour([], cost) == []
+    assert optimize_tour([1], cost) == [1]
+
+
+@pytest.mark.parametrize("numba", [True, False])
+@pytest.mark.parametrize("n", [1, 3, 4, 5, 30])
+def test_nearest_station_index(monkeypatch, numba, n):
+    """Each greedy step picks the closest unvisited station, with or without numba"""
+    if numba and not geo_kernels.NUMBA_AVAILABLE:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(geo_kernels, "NUMBA_AVAILABLE", numba)
+
+    points = random_points(n, n)
+    index = NearestStationIndex(points, HOME)
+    remaining = set(range(n))
+    position, current = None, HOME
+
+    while remaining:
+        idx, distance = index.nearest(position)
+        expected = {i: haversine_km_rad(*map(math.radians, (*current, *points[i]))) for i in remaining}
+
+        assert idx in remaining
+        assert distance == pytest.approx(expected[idx])
+        # The ranking matrix is float32, so near-ties may resolve either way
+        assert expected[idx] <= min(expected.values()) + 1e-3
+
+        index.mark_visited(idx)
+        remaining.discard(idx)
+        position, current = idx, points[idx]
+
+    assert index.nearest(position) == (None, float('inf'))
+
+
+def day_sizes(station_count, days):
+    """Stations per day the way MultiDayPlanner._plan_daily_routes splits them"""
+    per_day, remainder = divmod(station_count, days)
+    return [per_day + 1 if day < remainder else per_day for day in range(days)]
+
+
+def test_sweep_partition_places_every_station_once():
+    """Every station lands in exactly one day, and each day gets its requested size"""
+    for seed in range(50):
+        n = 1 + seed % 30
+        days = 1 + seed % 6
+        sizes = day_sizes(n, days)
+
+        groups = sweep_partition(random_points(n, seed), HOME, sizes)
+
+        assert [len(group) for group in groups] == sizes
+        assert sorted(i for group in groups for i in group) == list(range(n))
+        assert all(group == sorted(group) for group in groups)
+
+
+def test_sweep_partition_balanced_days():
+    """Day sizes differ by at most one station"""
+    for n, days in [(10, 3), (23, 2), (7, 7), (31, 4)]:
+        lengths = [len(group) for group in sweep_partition(random_points(n, n), HOME, day_sizes(n, days))]
+        assert max(lengths) - min(lengths) <= 1
+
+
+def test_sweep_partition_more_days_than_stations():
+    """Extra days come back empty instead of failing"""
+    groups = sweep_partition(random_points(3, 0), HOME, day_sizes(3, 5))
+    assert [len(group) for group in groups] == [1, 1, 1, 0, 0]
+    assert sorted(i for group in groups for i in group) == [0, 1, 2]
+
+    assert sweep_partition([], HOME, day_sizes(0, 2)) == [[], []]
+
+
+def test_sweep_partition_groups_by_direction():
+    """Clusters north, east, south and west of home each become one day"""
+    offsets = {"north": (0.5, 0.0), "east": (0.0, 0.5), "south": (-0.5, 0.0), "west": (0.0, -0.5)}
+    points, cluster_of = [], []
+    for name, (dlat, dlon) in offsets.items():
+        for k in range(3):
+            points.append((HOME[0] + dlat + k * 0.01, HOME[1] + dlon + k * 0.01))
+            cluster_of.append(name)
+
+    groups = sweep_partition(points, HOME, [3, 3, 3, 3])
+
+    assert sorted(tuple(sorted({cluster_of[i] for i in group})) for group in groups) == \
+        [("east",), ("north",), ("south",), ("west",)]
+
+
+@requires_numba
+def test_haversine_f32_matches_numpy():
+    """The float32 numba distance matrix agrees with the float64 NumPy one"""
+    radians = np.radians(np.asarray([HOME] + random_points(40, 1), dtype=np.float64))
+    lats, lons = radians[:, 0], radians[:, 1]
+    lats32, lons32 = lats.astype(np.float32), lons.astype(np.float32)
+
+    compiled = geo_kernels._haversine_km_f32(lats32[:, np.newaxis], lons32[:, np.newaxis],
+                                             lats32[np.newaxis, :], lons32[np.newaxis, :])
+
+    np.testing.assert_allclose(compiled, haversine_matrix_km(lats, lons), atol=0.05)
+
+
+@requires_numba
+def test_argmin_unvisited_matches_python():
+    """The compiled argmin agrees with its pure-Python version"""
+    rnd = np.random.default_rng(2)
+    for _ in range(50):
+        row = rnd.random(20).astype(np.float32)
+        visited = rnd.random(20) < 0.5
+        assert geo_kernels._argmin_unvisited(row, visited) == geo_kernels._argmin_unvisited.py_func(row, visited)
+
+    assert geo_kernels._argmin_unvisited(np.ones(3, dtype=np.float32), np.ones(3, dtype=bool)) == -1
+
+
+@requires_numba
+def test_two_opt_matches_python():
+    """The compiled 2-opt gives the same tour as its pure-Python version"""
+    for seed in range(20):
+        n = 6 + seed
+        cost = cost_matrix(random_points(n, seed))
+        tour = np.array([0] + list(range(1, n + 1)) + [0], dtype=np.int64)
+
+        compiled = geo_kernels._two_opt(tour.copy(), cost, TOUR_IMPROVEMENT_EPS_KM)
+        python = geo_kernels._two_opt.py_func(tour.copy(), cost, TOUR_IMPROVEMENT_EPS_KM)
+
+        np.testing.assert_array_equal(compiled, python)
+
+
+def or_opt_implementations():
+    """The module's Or-opt plus, when numba compiled it, the pure-Python version"""
+    implementations = [geo_kernels._or_opt]
+    if hasattr(geo_kernels._or_opt, "py_func"):
+        implementations.append(geo_kernels._or_opt.py_func)
+    return implementations
+
+
+def closed_length(tour, cost):
+    """Length of a tour array that already includes both endpoints"""
+    return float(sum(cost[a, b] for a, b in zip(tour[:-1], tour[1:])))
+
+
+@pytest.mark.parametrize("or_opt", or_opt_implementations())
+def test_or_opt_keeps_stops_and_endpoints(or_opt):
+    """Or-opt returns a permutation of the stops with both endpoints in place and no longer"""
+    for seed in range(40):
+        n = 3 + seed % 20
+        cost = cost_matrix(random_points(n, seed))
+        stops = list(range(1, n + 1))
+        random.Random(seed).shuffle(stops)
+        tour = np.array([0] + stops + [0], dtype=np.int64)
+        before = closed_length(tour, cost)
+
+        changed = or_opt(tour, cost, TOUR_IMPROVEMENT_EPS_KM, geo_kernels.OR_OPT_MAX_SEGMENT)
+
+        assert tour[0] == 0 and tour[-1] == 0
+        assert sorted(tour[1:-1].tolist()) == sorted(stops)
+        assert closed_length(tour, cost) <= before + TOUR_IMPROVEMENT_EPS_KM
+        if not changed:
+            assert tour[1:-1].tolist() == stops
+
+
+@pytest.mark.parametrize("or_opt", or_opt_implementations())
+def test_or_opt_relocates_misplaced_stop(or_opt):
+    """A stop visited out of line on a straight road is moved back between its neighbours"""
+    # Home at 0 km, stops at 1..5 km along a line; stop 5 is visited between 1 and 2
+    positions = np.arange(6, dtype=np.float64)
+    cost = np.abs(positions[:, np.newaxis] - positions[np.newaxis, :])
+    tour = np.array([0, 1, 5, 2, 3, 4, 0], dtype=np.int64)
+
+    changed = or_opt(tour, cost, TOUR_IMPROVEMENT_EPS_KM, geo_kernels.OR_OPT_MAX_SEGMENT)
+
+    assert changed
+    assert closed_length(tour, cost) == pytest.approx(10.0)
+    assert tour[0] == 0 and tour[-1] == 0
+
+
+@pytest.mark.parametrize("or_opt", or_opt_implementations())
+def test_or_opt_fixed_endpoints_with_distinct_ends(or_opt):
+    """An open path keeps its given start and end stops"""
+    for seed in range(20):
+        n = 8 + seed
+        cost = cost_matrix(random_points(n, seed))
+        tour = np.arange(n + 1, dtype=np.int64)
+        random.Random(seed).shuffle(tour[1:-1])
+        start, end = int(tour[0]), int(tour[-1])
+        middle = sorted(tour[1:-1].tolist())
+        before = closed_length(tour, cost)
+
+        or_opt(tour, cost, TOUR_IMPROVEMENT_EPS_KM, geo_kernels.OR_OPT_MAX_SEGMENT)
+
+        assert (int(tour[0]), int(tour[-1])) == (start, end)
+        assert sorted(tour[1:-1].tolist()) == middle
+        assert closed_length(tour, cost) <= before + TOUR_IMPROVEMENT_EPS_KM
+
+
+@requires_numba
+def test_or_opt_matches_python():
+    """The compiled Or-opt gives the same tour as its pure-Python version"""
+    for seed in range(20):
+        n = 6 + seed
+        cost = cost_matrix(random_points(n, seed))
+        tour = np.array([0] + list(range(1, n + 1)) + [0], dtype=np.int64)
+        compiled, python = tour.copy(), tour.copy()
+
+        assert geo_kernels._or_opt(compiled, cost, TOUR_IMPROVEMENT_EPS_KM, geo_kernels.OR_OPT_MAX_SEGMENT) == \
+            geo_kernels._or_opt.py_func(python, cost, TOUR_IMPROVEMENT_EPS_KM, geo_kernels.OR_OPT_MAX_SEGMENT)
+        np.testing.assert_array_equal(compiled, python)
+
+
+@requires_numba
+def test_mean_pairwise_matches_python():
+    """The compiled mean pairwise distance agrees with NumPy and with its pure-Python version"""
+    for n in (5, 12, 60):
+        points = random_points(n, n)
+        radians = np.radians(np.asarray(points, dtype=np.float64))
+        lats, lons = np.ascontiguousarray(radians[:, 0]), np.ascontiguousarray(radians[:, 1])
+        numpy_mean = haversine_matrix_km(lats, lons)[np.triu_indices(n, 1)].mean()
+
+        assert geo_kernels._mean_pairwise_km(lats, lons) == pytest.approx(numpy_mean)
+        assert geo_kernels._mean_pairwise_km.py_func(lats, lons) == pytest.approx(numpy_mean)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Test the district-optimized multi-day planner against a stubbed station database"""
+
+import sys
+import os
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.multi_day_planner import MultiDayPlanner
+from src.services.travel_time_service import TravelTimeService
+
+PROVINCE = "ชัยภูมิ"
+
+# Three compact districts north of home, five stations each
+DISTRICT_CENTERS = {
+    "เมืองชัยภูมิ": (15.80, 102.03),
+    "จัตุรัส": (15.56, 101.85),
+    "ภูเขียว": (16.37, 102.13),
+}
+
+
+def make_stations():
+    """Fresh station rows shaped like the Supabase table"""
+    stations = []
+    for district, (lat, lon) in DISTRICT_CENTERS.items():
+        for i in range(5):
+            stations.append({
+                "id_fm": len(stations) + 1,
+                "name": f"{district} FM {i + 1}",
+                "freq": 88.0 + len(stations) * 0.5,
+                "province": PROVINCE,
+                "district": district,
+                "lat": lat + i * 0.004,
+                "long": lon + i * 0.004,
+            })
+    return stations
+
+
+def make_planner(stations):
+    """Planner with a stubbed database and an offline (haversine estimate) travel service"""
+    planner = MultiDayPlanner()
+    planner.db = mock.Mock()
+    planner.db.get_stations_with_custom_filters.return_value = stations
+
+    travel_service = TravelTimeService()
+    travel_service.ors_api_key = None  # Never call the routing API from tests
+    planner.travel_service = travel_service
+    return planner
+
+
+def test_multi_day_planner():
+    """The district-optimized plan lists every planned station once, within the requested days"""
+    stations = make_stations()
+    planner = make_planner(stations)
+
+    result = planner.plan_with_district_optimization(
+        f"find me 15 stations in {PROVINCE} i want to go 2 day make a plan for me"
+    )
+
+    assert not result.startswith("❌"), result
+    planner.db.get_stations_with_custom_filters.assert_called_once_with(PROVINCE)
+    assert "District-Optimized" in result
+    assert "## 📅 Day 1" in result
+    assert "## 📅 Day 3" not in result
+
+    planned_names = [station["name"] for station in stations if f"**{station['name']}**" in result]
+    assert planned_names
+    for name in planned_names:
+        assert result.count(f"**{name}**") == 1
+
+
+def test_plan_by_districts_days():
+    """Day plans stay within the requested days, never repeat a station and return home"""
+    stations = make_stations()
+    planner = make_planner(stations)
+    worth_districts = [
+        analysis for analysis in planner.district_worth_agent.analyze_all_districts(stations)
+        if analysis["should_visit"]
+    ]
+
+    daily_plans = list(planner._plan_by_districts(worth_districts, stations, {"days": 2}))
+
+    assert 1 <= len(daily_plans) <= 2
+    assert [plan["day"] for plan in daily_plans] == list(range(1, len(daily_plans) + 1))
+
+    planned_ids = [station["id_fm"] for plan in daily_plans for station in plan["stations"]]
+    assert planned_ids
+    assert len(planned_ids) == len(set(planned_ids))
+
+    for plan in daily_plans:
+        assert plan["stations"]
+        assert plan["districts_visited"] == list(dict.fromkeys(s["district"] for s in plan["stations"]))
+        assert plan["total_distance_km"] > 0
+        assert plan["return_minutes"] > MultiDayPlanner.DAILY_START_MINUTES
+
+
+def test_unparsable_request():
+    """A request without a known province is rejected before any database query"""
+    planner = make_planner(make_stations())
+
+    result = planner.plan_with_district_optimization("plan 3 days somewhere")
+
+    assert result.startswith("❌")
+    planner.db.get_stations_with_custom_filters.assert_not_called()
+
+
+if __name__ == "__main__":
+    test_multi_day_planner()
+    test_plan_by_districts_days()
+    test_unparsable_request()
+    print("All multi-day planner tests passed")